@@ -3,238 +3,401 @@ API de Análise Unificada - Combina extração de dados e geração de overview
 Evita redundância de chamadas ao serviço de extração.
 """
 
+import asyncio
+import logging
+import zlib
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Union
+
+import orjson
 from fastapi import APIRouter, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from models.basic import RepoRequest
-from schemas.analyze import AnalyzeResponseSchema
-from services.extract import download_and_extract
+from schemas.analyze import (
+    AnalyzeAllResponseSchema,
+    AnalyzeBatchRequestSchema,
+    AnalyzeBatchResponseSchema,
+    AnalyzeResponseSchema,
+)
+from schemas.extract import (
+    ContextSchema,
+    FileAnalysisSchema,
+    RepositoryInfoSchema,
+)
+from services.cache import TTLCache
+from services.extract import fetch_metadata, fetch_payload
+from services.fallback_overview import (
+    MIN_CONTEXT_CHARS_FOR_AI,
+    NO_AI_USAGE,
+    is_complete_overview,
+    render_fallback_overview,
+)
 from services.gemini import gemini_service
+from services.github_api import GitHubAPIService
+from services.inflight import InflightRequests
+from services.learning_service import (
+    TECH_DATABASE,
+    dedupe_technologies,
+    generate_learning_resources,
+    normalize_tech_name,
+)
 from core.config import settings
+from core.error_sampler import should_log_trace
+from core.prompt_template import PromptTemplate
+from core.tokens import count_tokens, fit_to_tokens
 
 
 router = APIRouter(prefix="/analyze", tags=["Análise Unificada"])
 
+log = logging.getLogger("nexo.analyze")
+
+# Análises completas por (url, branch, SHA do commit) - evita refazer extração + IA
+_analysis_cache = TTLCache(
+    ttl_seconds=settings.ANALYZE_CACHE_TTL_SECONDS,
+    max_entries=settings.ANALYZE_CACHE_MAX_ENTRIES,
+)
+
+# Overviews por conteúdo do payload - usado quando o SHA do commit não está
+# disponível (ex.: falha na API do GitHub), para não repetir a chamada à IA
+_overview_cache = TTLCache(
+    ttl_seconds=settings.ANALYZE_CACHE_TTL_SECONDS,
+    max_entries=settings.ANALYZE_CACHE_MAX_ENTRIES,
+)
+
+# Análises em andamento - pedidos idênticos simultâneos aguardam a mesma execução
+_inflight_analyses = InflightRequests()
+
 
 # Prompt otimizado para gerar overview de onboarding em HTML
 OVERVIEW_PROMPT_TEMPLATE = """You are an expert in code analysis and technical communication.
 
-⚠️ CRITICAL LANGUAGE REQUIREMENT: Your ENTIRE output MUST be in ENGLISH. If the source content (README, description, etc.) is in Portuguese, Spanish, or any other language, you MUST TRANSLATE everything to English in your response. No exceptions.
-
-Analyze the following repository and generate a **contextual overview** in pure HTML (to be rendered in React).
+Write a clear, well-structured onboarding overview of the repository below in pure HTML (rendered in React). Your ENTIRE output MUST be in ENGLISH: translate any Portuguese, Spanish or other non-English source content.
 
-## Repository Information:
-- **Name:** {repo_name}
-- **Description:** {description}
-- **Stars:** {stars} ⭐ | **Forks:** {forks} 🍴
-- **Last Update:** {updated_at}
+## Repository Information
+- Name: {repo_name}
+- Description: {description}
+- Stars: {stars} ⭐ | Forks: {forks} 🍴
+- Last Update: {updated_at}
 
-## Context Files (README, configs, etc.):
+## Context Files (README, configs, etc.)
 {context_payload}
 
 ---
 
-## Your Task:
-Generate a **clear and well-structured overview** in HTML, focused on the GENERAL CONTEXT of the project.
-REMEMBER: Output must be 100% in English, translate any non-English content.
-
-### HTML Structure (use semantic tags):
-
-1. **Title and Introduction**
-   - Use <h2> for the catchy title with emoji
-   - Use <p> for a welcome paragraph explaining what the project is
-
-2. **The Problem and the Solution**
-   - Use <h3> for section subtitles
-   - Use <p> for paragraphs explaining the problem and the solution
-
-3. **Main Features**
-   - Use <h3> for the section title
-   - Use <ul> and <li> to list features with emojis
-
-4. **Who Is This Project For?**
-   - Use <h3> for the title
-   - Use <p> to describe target audience and use cases
-
-5. **Getting Started** (IF there is information about installation/usage)
-   - Use <h3> for the title
-   - Use <ol> and <li> for numbered steps
-   - Only if there is clear information in README or configs
-
-6. **Final Considerations**
-   - Use <h3> for the title
-   - Use <p> for closing
-
-### IMPORTANT HTML formatting rules:
-- Use <strong> for important bold text
-- Use <em> for emphasis
-- Use <code> for inline technical terms
-- Use CSS classes for styling: class="overview-title", class="overview-section", class="feature-list", class="steps-list"
-- DO NOT include <html>, <head>, <body> tags - only the internal content
-- DO NOT use inline style attributes
-- DO NOT list languages, frameworks, or technical libraries
-- DO NOT show directory structure or folders
-- DO NOT make technical architecture analysis
-- FOCUS on general context, purpose, and project value
+## Sections (in order)
+1. <h2> catchy title with emoji, then a <p> welcome paragraph on what the project is
+2. <h3> The Problem and the Solution, with <p> paragraphs
+3. <h3> Main Features, as a <ul>/<li> list with emojis
+4. <h3> Who Is This Project For?, with <p> on target audience and use cases
+5. <h3> Getting Started, with <ol>/<li> steps - ONLY if the README or configs clearly describe installation/usage
+6. <h3> Final Considerations, with a closing <p>
+
+## Rules
 - Be informative but accessible (not too technical)
-- Use emojis moderately to make it visually pleasant
-- Base yourself ONLY on the provided data
-- Return ONLY the HTML, without additional explanations or code blocks
+- Focus on general context, purpose and project value: DO NOT list languages, frameworks or libraries, show directories, or analyze the architecture
+- Use <strong>, <em> and <code> inline, and the classes overview-title, overview-section, feature-list, steps-list; no inline style attributes
+- No <html>, <head> or <body> tags: return ONLY the HTML, without explanations or code blocks
+- Use emojis moderately and base yourself ONLY on the provided data
 """
 
+# Limite de tamanho do prompt enviado ao Gemini (em tokens)
+MAX_PROMPT_TOKENS = 25000
 
-@router.post(
-    "/full",
-    status_code=status.HTTP_200_OK,
-    response_model=AnalyzeResponseSchema,
-    summary="Análise completa do repositório",
-    description="Extrai dados do repositório e gera overview com IA em uma única chamada.",
+# Folga reservada para o marcador de truncamento
+PROMPT_TOKEN_MARGIN = 125
+
+TRUNCATION_MARKER = "\n\n... [CONTEXTO TRUNCADO POR LIMITE DE TAMANHO] ..."
+
+# Template analisado uma única vez (na importação do módulo)
+OVERVIEW_PROMPT = PromptTemplate(OVERVIEW_PROMPT_TEMPLATE)
+
+# Linguagens consideradas nos recursos de aprendizado de /analyze/all
+MAX_LANGUAGE_TECHNOLOGIES = 5
+
+# Tamanho máximo da descrição enviada como contexto dos recursos de aprendizado
+MAX_LEARNING_CONTEXT_CHARS = 500
+
+# Parâmetros da geração do overview (iguais nas versões normal e em streaming)
+OVERVIEW_GENERATION = {"max_output_tokens": 4096, "temperature": 0.7, "timeout": 90.0}
+
+# Campos fixos da resposta de erro de extração (validados uma vez, na importação)
+EXTRACTION_ERROR_FIELDS = AnalyzeResponseSchema(
+    status="error",
+    repository=None,
+    file_analysis=None,
+    overview=None,
+    overview_usage=None,
+    context=None,
+    overview_error=None,
+).model_dump(exclude={"dependencies", "directory_structure", "errors"})
+
+# Campos de cada evento do endpoint em streaming
+STREAM_HEADER_FIELDS = (
+    "repository",
+    "file_analysis",
+    "dependencies",
+    "directory_structure",
+    "context",
 )
-async def analyze_repository(payload: RepoRequest):
+STREAM_DONE_FIELDS = ("status", "overview_usage", "overview_error", "errors")
+
+
+def _extraction_error_response(message: str) -> AnalyzeResponseSchema:
+    """Resposta de erro de extração, sem passar pela validação do Pydantic."""
+    return AnalyzeResponseSchema.model_construct(
+        **EXTRACTION_ERROR_FIELDS,
+        dependencies=[],
+        directory_structure={},
+        errors=[message],
+    )
+
+
+@lru_cache(maxsize=1)
+def _overview_static_tokens() -> int:
+    """Tokens do texto fixo do prompt (calculado uma vez)."""
+    return count_tokens(OVERVIEW_PROMPT.static_text)
+
+
+async def _prepare_analysis(
+    payload: RepoRequest,
+) -> Union[dict, AnalyzeResponseSchema]:
     """
-    Endpoint unificado que:
-    1. Baixa e analisa o repositório (extração de metadados, arquivos, etc.)
-    2. Gera overview com IA usando o contexto extraído
-    3. Retorna tudo em uma única resposta
+    Etapas comuns às versões normal e em streaming: cache, extração,
+    montagem dos dados de resposta e do prompt.
 
-    Benefícios:
-    - Evita duplicação de chamadas ao serviço de extração
-    - Reduz latência total (uma única requisição)
-    - Mantém consistência dos dados
+    Retorna a resposta pronta (cache ou erro de extração) ou um dict com
+    os dados extraídos e o prompt a ser enviado ao Gemini.
     """
     errors = []
-    extract_result = None
 
     # Usa o token do payload ou o token do .env como fallback
     github_token = payload.token or settings.GITHUB_TOKEN
 
-    # Log para debug
     if github_token:
-        print(
-            f"✅ Token GitHub encontrado (fonte: {'payload' if payload.token else '.env'})"
+        log.debug(
+            "github_token", extra={"source": "payload" if payload.token else ".env"}
         )
     else:
-        print("❌ ERRO: Nenhum token GitHub configurado!")
+        log.warning("github_token_missing")
 
-    # === ETAPA 1: Extração do Repositório ===
-    try:
-        print(
-            f"🚀 Iniciando extração de: {payload.github_url} (branch: {payload.branch})"
-        )
-        extract_result = await download_and_extract(
+    # Metadados e payload (download do ZIP) começam antes da consulta do SHA:
+    # num cache miss, a consulta não soma uma ida ao GitHub antes deles
+    log.info(
+        "extract_start", extra={"url": payload.github_url, "branch": payload.branch}
+    )
+    meta_task = asyncio.create_task(fetch_metadata(payload.github_url, github_token))
+    payload_task = asyncio.create_task(
+        fetch_payload(
             github_url=payload.github_url,
             branch=payload.branch,
             token=github_token,
+            metadata_task=meta_task,
         )
-        print("✅ Extração concluída com sucesso!")
-    except Exception as e:
-        print(f"❌ ERRO na extração: {str(e)}")
-        print(f"❌ Tipo do erro: {type(e).__name__}")
-        import traceback
-
-        print(f"❌ Traceback: {traceback.format_exc()}")
-        return AnalyzeResponseSchema(
-            status="error",
-            repository=None,
-            file_analysis=None,
-            dependencies=[],
-            directory_structure={},
-            overview=None,
-            overview_usage=None,
-            context=None,
-            errors=[f"Erro na extração: {str(e)}"],
-            overview_error=None,
-        )
-
-    # === ETAPA 2: Montar dados de resposta da extração ===
-    github_data = extract_result.get("github", {})
-    metadata = github_data.get("metadata") or {}
-
-    # Monta informações do repositório
-    repository_info = {
-        "info": metadata if metadata else None,
-        "contributors": github_data.get("contributors", []),
-        "branches": {
-            "count": github_data.get("branch_count", 0),
-            "list": github_data.get("branches", []),
-        },
-        "languages": github_data.get("languages", {}),
-    }
-
-    # Monta análise de arquivos
-    file_stats = extract_result.get("file_stats") or {}
-    file_analysis = {
-        "summary": {
-            "total_files": file_stats.get("total_files", 0),
-            "total_lines": file_stats.get("total_lines", 0),
-            "total_size": file_stats.get("total_size_human", "0 B"),
-            "files_in_context": file_stats.get("files_in_context", 0),
-            "total_analyzed": file_stats.get("total_files_analyzed", 0),
-        },
-        "by_category": file_stats.get("by_category", {}),
-        "top_extensions": file_stats.get("by_extension", {}),
-    }
+    )
 
-    # Monta contexto
-    context_info = {
-        "payload": extract_result.get("payload", ""),
-        "total_chars": extract_result.get("payload_chars", 0),
-        "estimated_tokens": extract_result.get("payload_chars", 0) // 4,
-        "max_chars": extract_result.get("payload_max_chars", 48000),
-        "files_in_context": file_stats.get("files_in_context", 0),
-        "total_analyzed": file_stats.get("total_files_analyzed", 0),
-        "included_files": extract_result.get("included_files", []),
-    }
+    # === ETAPA 0: Cache por commit ===
+    # O SHA é buscado com o token do próprio usuário, então um repositório
+    # privado só é servido do cache para quem também tem acesso a ele.
+    head_sha = await GitHubAPIService(token=github_token).get_head_sha(
+        payload.github_url, payload.branch
+    )
+    cache_key = (
+        (payload.github_url.rstrip("/"), payload.branch, head_sha)
+        if head_sha
+        else None
+    )
+    if cache_key:
+        cached_response = _analysis_cache.get(cache_key)
+        if cached_response is not None:
+            log.info("cache_hit", extra={"sha": head_sha[:7]})
+            payload_task.cancel()
+            meta_task.cancel()
+            return cached_response
 
-    # Erros da extração
-    if extract_result.get("errors"):
-        errors.extend(extract_result["errors"])
+    # === ETAPA 1: Extração do Repositório ===
+    # Enquanto o ZIP é baixado, já monta os campos do cabeçalho do prompt
+    github_data = await meta_task
+    metadata = github_data.get("metadata") or {}
 
-    # === ETAPA 3: Geração do Overview com IA ===
     repo_name = metadata.get("full_name", "Repositório")
     description = metadata.get("description") or "Sem descrição disponível"
     stars = metadata.get("stars", 0)
     forks = metadata.get("forks", 0)
     updated_at = metadata.get("updated_at", "N/A")
 
-    # Monta o prompt
-    prompt = OVERVIEW_PROMPT_TEMPLATE.format(
-        repo_name=repo_name,
-        description=description,
-        stars=stars,
-        forks=forks,
-        updated_at=updated_at,
-        context_payload=extract_result.get("payload", "Nenhum contexto extraído"),
+    (payload_result,) = await asyncio.gather(payload_task, return_exceptions=True)
+
+    if isinstance(payload_result, Exception):
+        e = payload_result
+        # Formatar a pilha custa caro: no máximo um traceback por minuto por
+        # tipo de exceção, mesmo sob uma rajada de falhas
+        trace = should_log_trace(f"analyze:{type(e).__name__}")
+        log.error(
+            "extract_failed",
+            extra={"err": str(e), "type": type(e).__name__},
+            exc_info=e if trace else None,
+        )
+        return _extraction_error_response(f"Erro na extração: {str(e)}")
+
+    extract_result = {"github": github_data, **payload_result}
+    log.info("extract_done", extra={"url": payload.github_url})
+
+    # === ETAPA 2: Montar dados de resposta da extração ===
+    repository_info = RepositoryInfoSchema.from_github(github_data)
+
+    file_stats = extract_result.get("file_stats") or {}
+    file_analysis = FileAnalysisSchema.from_file_stats(file_stats)
+
+    # Limita o payload ao orçamento de tokens do prompt (uma única codificação,
+    # que também fornece a contagem de tokens do contexto)
+    header_tokens = count_tokens(f"{repo_name}{description}{stars}{forks}{updated_at}")
+    payload_budget = (
+        MAX_PROMPT_TOKENS
+        - _overview_static_tokens()
+        - header_tokens
+        - PROMPT_TOKEN_MARGIN
     )
+    raw_payload = extract_result.get("payload", "Nenhum contexto extraído")
+    # A tokenização de contextos grandes roda fora do event loop
+    if len(raw_payload) > settings.CPU_OFFLOAD_MIN_CHARS:
+        context_payload, payload_tokens, truncated = await asyncio.to_thread(
+            fit_to_tokens, raw_payload, payload_budget
+        )
+    else:
+        context_payload, payload_tokens, truncated = fit_to_tokens(
+            raw_payload, payload_budget
+        )
+    if truncated:
+        context_payload += TRUNCATION_MARKER
+
+    payload_chars = extract_result.get("payload_chars", 0)
+    context_info = ContextSchema(
+        # Os campos grandes saem do resultado da extração em vez de serem
+        # referenciados por ele e pela resposta até o fim da requisição
+        payload=extract_result.pop("payload", ""),
+        total_chars=payload_chars,
+        estimated_tokens=payload_tokens,
+        max_chars=extract_result.get("payload_max_chars", 48000),
+        files_in_context=file_stats.get("files_in_context", 0),
+        total_analyzed=file_stats.get("total_files_analyzed", 0),
+        included_files=extract_result.pop("included_files", []),
+    )
+
+    # Erros da extração
+    if extract_result.get("errors"):
+        errors.extend(extract_result["errors"])
 
-    # Limita o prompt se necessário
-    max_prompt_chars = 100000
-    if len(prompt) > max_prompt_chars:
-        excess = len(prompt) - max_prompt_chars
-        original_payload = extract_result.get("payload", "")
-        truncated_payload = original_payload[: len(original_payload) - excess - 500]
-        truncated_payload += "\n\n... [CONTEXTO TRUNCADO POR LIMITE DE TAMANHO] ..."
+    # Sem SHA, o overview é reaproveitado pela impressão digital do payload.
+    # Adler-32 basta aqui: é só invalidação de cache, não segurança.
+    overview_key = None
+    if cache_key is None:
+        overview_key = (
+            payload.github_url.rstrip("/"),
+            payload.branch,
+            len(context_info.payload),
+            zlib.adler32(context_info.payload.encode()),
+        )
 
-        prompt = OVERVIEW_PROMPT_TEMPLATE.format(
+    # === ETAPA 3: Montagem do prompt ===
+    # Overview já conhecido (sem contexto relevante ou gerado antes para o
+    # mesmo payload): o Gemini é pulado
+    ready_overview = _overview_cache.get(overview_key) if overview_key else None
+    if ready_overview is not None:
+        log.info("overview_cache_hit", extra={"url": payload.github_url})
+        prompt = None
+    elif payload_chars < MIN_CONTEXT_CHARS_FOR_AI:
+        log.info("overview_skipped", extra={"payload_chars": payload_chars})
+        ready_overview = (render_fallback_overview(metadata), NO_AI_USAGE)
+        prompt = None
+    else:
+        prompt = OVERVIEW_PROMPT.render(
             repo_name=repo_name,
             description=description,
             stars=stars,
             forks=forks,
             updated_at=updated_at,
-            context_payload=truncated_payload,
+            context_payload=context_payload,
+        )
+
+    return {
+        "cache_key": cache_key,
+        "overview_key": overview_key,
+        "repository": repository_info,
+        "file_analysis": file_analysis,
+        "dependencies": extract_result.get("dependencies", []),
+        "directory_structure": extract_result.get("directory_structure", {}),
+        "context": context_info,
+        "errors": errors,
+        "prompt": prompt,
+        "ready_overview": ready_overview,
+    }
+
+
+def _finalize_analysis(
+    prepared: dict,
+    overview_content: Optional[str],
+    overview_usage: Optional[dict],
+    overview_error: Optional[str],
+) -> AnalyzeResponseSchema:
+    """Determina o status final, monta a resposta e guarda no cache."""
+    errors = prepared["errors"]
+
+    # === ETAPA 4: Determinar status final ===
+    if overview_content and not errors:
+        final_status = "success"
+    elif overview_content or (prepared["repository"].info is not None):
+        final_status = "partial"  # Tem dados, mas pode ter erros em alguma parte
+    else:
+        final_status = "error"
+
+    response = AnalyzeResponseSchema(
+        status=final_status,
+        repository=prepared["repository"],
+        file_analysis=prepared["file_analysis"],
+        dependencies=prepared["dependencies"],
+        directory_structure=prepared["directory_structure"],
+        overview=overview_content,
+        overview_usage=overview_usage,
+        context=prepared["context"],
+        errors=errors if errors else None,
+        overview_error=overview_error,
+    )
+
+    # Só guarda análises completas - erros parciais devem ser refeitos
+    if prepared["cache_key"] and final_status == "success":
+        _analysis_cache.set(prepared["cache_key"], response)
+
+    # Sem SHA, guarda ao menos o overview (o resto da análise é barato)
+    if prepared["overview_key"] and overview_content and not overview_error:
+        _overview_cache.set(
+            prepared["overview_key"], (overview_content, overview_usage)
         )
 
-    # Chama o Gemini
-    print(f"🤖 Chamando Gemini para gerar overview...")
-    print(f"📊 Tamanho do prompt: {len(prompt)} caracteres")
-    gemini_result = await gemini_service.generate_content(
-        prompt=prompt,
-        max_output_tokens=4096,
-        temperature=0.7,
-        timeout=90.0,
+    return response
+
+
+async def _complete_analysis(
+    prepared: Union[dict, AnalyzeResponseSchema],
+) -> AnalyzeResponseSchema:
+    """Gera o overview de uma análise preparada e monta a resposta final."""
+    if isinstance(prepared, AnalyzeResponseSchema):
+        return prepared
+
+    if prepared["ready_overview"] is not None:
+        overview_content, overview_usage = prepared["ready_overview"]
+        return _finalize_analysis(prepared, overview_content, overview_usage, None)
+
+    # Chama o Gemini (o prompt sai de `prepared`: só a chamada o referencia)
+    prompt = prepared.pop("prompt")
+    log.info("overview_start", extra={"prompt_chars": len(prompt)})
+    gemini_result = await gemini_service.generate_content_checked(
+        prompt, is_complete_overview, **OVERVIEW_GENERATION
     )
-    print(f"✅ Gemini respondeu: success={gemini_result.get('success')}")
+    del prompt
     if not gemini_result.get("success"):
-        print(f"❌ Erro do Gemini: {gemini_result.get('error')}")
+        log.warning("overview_failed", extra={"err": gemini_result.get("error")})
 
     # Monta resultado do overview
     overview_content = None
@@ -249,23 +412,256 @@ async def analyze_repository(payload: RepoRequest):
             "error", "Erro desconhecido na geração do overview"
         )
 
-    # === ETAPA 4: Determinar status final ===
-    if overview_content and not errors:
-        final_status = "success"
-    elif overview_content or (repository_info.get("info") is not None):
-        final_status = "partial"  # Tem dados, mas pode ter erros em alguma parte
+    return _finalize_analysis(
+        prepared, overview_content, overview_usage, overview_error
+    )
+
+
+async def _run_analysis(payload: RepoRequest) -> AnalyzeResponseSchema:
+    """Executa a análise completa (extração + overview)."""
+    return await _complete_analysis(await _prepare_analysis(payload))
+
+
+@router.post(
+    "/full",
+    status_code=status.HTTP_200_OK,
+    response_model=AnalyzeResponseSchema,
+    summary="Análise completa do repositório",
+    description="Extrai dados do repositório e gera overview com IA em uma única chamada.",
+)
+async def analyze_repository(payload: RepoRequest):
+    """
+    Endpoint unificado que:
+    1. Baixa e analisa o repositório (extração de metadados, arquivos, etc.)
+    2. Gera overview com IA usando o contexto extraído
+    3. Retorna tudo em uma única resposta
+
+    Benefícios:
+    - Evita duplicação de chamadas ao serviço de extração
+    - Reduz latência total (uma única requisição)
+    - Mantém consistência dos dados
+    """
+    # Requisições simultâneas para o mesmo repositório compartilham a execução.
+    # O token entra na chave: repositório privado só é compartilhado com
+    # quem usa as mesmas credenciais.
+    github_token = payload.token or settings.GITHUB_TOKEN
+    key = (payload.github_url.rstrip("/"), payload.branch, github_token)
+    return await _inflight_analyses.run(key, lambda: _run_analysis(payload))
+
+
+@router.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=AnalyzeBatchResponseSchema,
+    summary="Análise completa de vários repositórios",
+    description="Executa /analyze/full para cada item, com concorrência limitada.",
+)
+async def analyze_batch(payload: AnalyzeBatchRequestSchema):
+    """
+    Analisa vários repositórios em paralelo, no máximo `max_concurrency`
+    por vez. Repetições (no lote ou entre requisições) aproveitam o cache
+    e o agrupamento de análises em andamento de /analyze/full.
+    """
+    semaphore = asyncio.Semaphore(payload.max_concurrency)
+
+    async def analyze_one(item: RepoRequest) -> AnalyzeResponseSchema:
+        async with semaphore:
+            return await analyze_repository(item)
+
+    results = await asyncio.gather(
+        *(analyze_one(item) for item in payload.items), return_exceptions=True
+    )
+
+    # Uma falha inesperada em um item não derruba o lote inteiro
+    responses = []
+    for item, result in zip(payload.items, results):
+        if isinstance(result, Exception):
+            trace = should_log_trace(f"analyze_batch:{type(result).__name__}")
+            log.error(
+                "batch_item_failed",
+                extra={"url": item.github_url, "err": str(result)},
+                exc_info=result if trace else None,
+            )
+            result = _extraction_error_response(f"Erro na análise: {str(result)}")
+        responses.append(result)
+
+    return AnalyzeBatchResponseSchema(results=responses)
+
+
+def _detected_technologies(
+    prepared: Union[dict, AnalyzeResponseSchema],
+) -> tuple[list[str], str]:
+    """
+    Tecnologias do repositório (linguagens e dependências conhecidas) e sua
+    descrição, para os recursos de aprendizado.
+    """
+    if isinstance(prepared, AnalyzeResponseSchema):
+        repository = prepared.repository
+        dependencies = [dep.model_dump() for dep in prepared.dependencies]
     else:
-        final_status = "error"
+        repository = prepared["repository"]
+        dependencies = prepared["dependencies"]
 
-    return AnalyzeResponseSchema(
-        status=final_status,
-        repository=repository_info,
-        file_analysis=file_analysis,
-        dependencies=extract_result.get("dependencies", []),
-        directory_structure=extract_result.get("directory_structure", {}),
-        overview=overview_content,
-        overview_usage=overview_usage,
-        context=context_info,
-        errors=errors if errors else None,
-        overview_error=overview_error,
+    if repository is None:
+        return [], ""
+
+    # Linguagens em ordem de volume de código
+    languages = sorted(
+        repository.languages, key=repository.languages.get, reverse=True
+    )
+    technologies = languages[:MAX_LANGUAGE_TECHNOLOGIES]
+
+    # Dependências que correspondem a tecnologias conhecidas (react, fastapi...)
+    for dep in dependencies:
+        for name in (*dep["dependencies"], *dep["dev_dependencies"]):
+            if normalize_tech_name(name) in TECH_DATABASE:
+                technologies.append(name)
+
+    description = repository.info.description if repository.info else None
+    description = (description or "")[:MAX_LEARNING_CONTEXT_CHARS]
+    # Sem repetições (ex.: "TypeScript" e "typescript"), no máximo 10
+    return dedupe_technologies(technologies)[:10], description
+
+
+@router.post(
+    "/all",
+    status_code=status.HTTP_200_OK,
+    response_model=AnalyzeAllResponseSchema,
+    summary="Análise completa + recursos de aprendizado",
+    description=(
+        "Extrai o repositório uma única vez e gera, em paralelo, o overview e "
+        "os recursos de aprendizado das tecnologias detectadas."
+    ),
+)
+async def analyze_all(payload: RepoRequest):
+    """
+    Equivale a chamar /analyze/full e /learning-resources em sequência, mas
+    com uma única extração. As duas chamadas ao Gemini rodam em paralelo
+    (limitadas pelo controle de concorrência do `gemini_service`).
+    """
+    prepared = await _prepare_analysis(payload)
+    technologies, description = _detected_technologies(prepared)
+
+    analysis, learning = await asyncio.gather(
+        _complete_analysis(prepared),
+        generate_learning_resources(technologies, repo_context=description),
+    )
+
+    learning_error = learning.pop("error", None)
+    return AnalyzeAllResponseSchema(
+        analysis=analysis,
+        learning=learning if learning["learning_resources"] else None,
+        learning_error=learning_error,
+    )
+
+
+def _json_default(value):
+    """Converte os schemas Pydantic presentes nos eventos para JSON."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+# Datas passam pelo _json_default (str), como no json da stdlib
+NDJSON_OPTIONS = (
+    orjson.OPT_APPEND_NEWLINE
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+
+def _ndjson(event: dict) -> bytes:
+    """Serializa um evento como uma linha JSON (NDJSON), direto em bytes UTF-8."""
+    return orjson.dumps(event, default=_json_default, option=NDJSON_OPTIONS)
+
+
+async def _stream_analysis(
+    prepared: Union[dict, AnalyzeResponseSchema],
+) -> AsyncIterator[bytes]:
+    """Gera as linhas NDJSON da análise em streaming."""
+    # Resposta já pronta (cache ou erro de extração): emite em uma só passada
+    if isinstance(prepared, AnalyzeResponseSchema):
+        data = prepared.model_dump(mode="json")
+        if data["status"] != "error" or data["repository"] is not None:
+            yield _ndjson(
+                {"event": "extraction", **{k: data[k] for k in STREAM_HEADER_FIELDS}}
+            )
+        if data["overview"]:
+            yield _ndjson({"event": "overview", "delta": data["overview"]})
+        yield _ndjson({"event": "done", **{k: data[k] for k in STREAM_DONE_FIELDS}})
+        return
+
+    # Cabeçalho com os dados da extração, antes de a IA começar a gerar
+    yield _ndjson(
+        {"event": "extraction", **{k: prepared[k] for k in STREAM_HEADER_FIELDS}}
+    )
+
+    if prepared["ready_overview"] is not None:
+        overview_content, overview_usage = prepared["ready_overview"]
+        yield _ndjson({"event": "overview", "delta": overview_content})
+        response = _finalize_analysis(prepared, overview_content, overview_usage, None)
+        data = response.model_dump(mode="json", include=set(STREAM_DONE_FIELDS))
+        yield _ndjson({"event": "done", **data})
+        return
+
+    prompt = prepared.pop("prompt")
+    log.info("overview_stream_start", extra={"prompt_chars": len(prompt)})
+    chunks = []
+    overview_usage = None
+    overview_error = None
+
+    stream = gemini_service.generate_content_stream(
+        prompt=prompt, **OVERVIEW_GENERATION
+    )
+    # O gerador mantém sua própria referência enquanto precisar do prompt
+    del prompt
+
+    async for event in stream:
+        if event["type"] == "delta":
+            chunks.append(event["text"])
+            yield _ndjson({"event": "overview", "delta": event["text"]})
+        elif event["type"] == "done":
+            overview_usage = event.get("usage")
+        else:
+            overview_error = event.get(
+                "error", "Erro desconhecido na geração do overview"
+            )
+            log.warning("overview_failed", extra={"err": overview_error})
+
+    # Overview interrompido no meio não é considerado válido
+    overview_content = "".join(chunks) if chunks and not overview_error else None
+
+    response = _finalize_analysis(
+        prepared, overview_content, overview_usage, overview_error
+    )
+    data = response.model_dump(mode="json", include=set(STREAM_DONE_FIELDS))
+    yield _ndjson({"event": "done", **data})
+
+
+@router.post(
+    "/full/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Análise completa do repositório (streaming)",
+    description=(
+        "Mesma análise de /full, entregue em NDJSON: os dados da extração "
+        "chegam assim que ficam prontos e o overview é enviado à medida que "
+        "a IA o gera."
+    ),
+    response_class=StreamingResponse,
+)
+async def analyze_repository_stream(payload: RepoRequest):
+    """
+    Versão em streaming de `/analyze/full` (JSON Lines).
+
+    Cada linha é um evento:
+    - `{"event": "extraction", "repository": ..., "file_analysis": ...,
+      "dependencies": ..., "directory_structure": ..., "context": ...}`
+    - `{"event": "overview", "delta": "..."}` - trecho do overview (0..n vezes);
+      o cliente concatena os trechos
+    - `{"event": "done", "status": ..., "overview_usage": ...,
+      "overview_error": ..., "errors": ...}` - sempre a última linha
+    """
+    prepared = await _prepare_analysis(payload)
+    return StreamingResponse(
+        _stream_analysis(prepared), media_type="application/x-ndjson"
     )
@@ -1,13 +1,51 @@
-from fastapi import APIRouter, Depends, status
+import logging
+
+from fastapi import APIRouter, Depends, Response, status
 
 from models.basic import RepoRequest
-from schemas.extract import ExtractResponseSchema
-from services.extract import download_and_extract
+from schemas.extract import (
+    ExtractResponseSchema,
+    FileAnalysisSchema,
+    RepositoryInfoSchema,
+)
+from services.extract_cache import get_or_extract_derived
+from core.tokens import count_tokens
 from core.config import settings
 
 
 router = APIRouter(prefix="/extract", tags=["Extração"])
 
+log = logging.getLogger("nexo.extract")
+
+
+def _build_extract_response(result: dict) -> bytes:
+    """Monta e serializa a resposta do endpoint a partir da extração."""
+    response = ExtractResponseSchema(
+        status="success",
+        # Metadados do GitHub
+        repository=RepositoryInfoSchema.from_github(result["github"]),
+        # Estatísticas de arquivos
+        file_analysis=FileAnalysisSchema.from_file_stats(result["file_stats"]),
+        # Dependências
+        dependencies=result["dependencies"],
+        # Estrutura de pastas
+        directory_structure=result["directory_structure"],
+        # Contexto para IA (OTIMIZADO COM PRIORIZAÇÃO)
+        context={
+            "payload": result["payload"],
+            "total_chars": result["payload_chars"],
+            "max_chars": result.get("payload_max_chars", 48000),
+            "estimated_tokens": count_tokens(result["payload"]),
+            "files_in_context": result["file_stats"].get("files_in_context", 0),
+            "total_analyzed": result["file_stats"].get("total_files_analyzed", 0),
+            "included_files": result.get("included_files", []),
+        },
+        # Erros (se houver)
+        errors=result["errors"],
+    )
+    # Serializador do Pydantic (Rust) direto em bytes, sem a str intermediária
+    return ExtractResponseSchema.__pydantic_serializer__.to_json(response)
+
 
 @router.post(
     "/context", status_code=status.HTTP_200_OK, response_model=ExtractResponseSchema
@@ -28,57 +66,22 @@ async def extract_repo_context(payload: RepoRequest):
     """
     # Usa o token do payload ou o token do .env como fallback
     github_token = payload.token or settings.GITHUB_TOKEN
-    
-    # Log para debug
+
     if github_token:
-        print(f"✅ Token GitHub encontrado (fonte: {'payload' if payload.token else '.env'})")
+        log.debug(
+            "github_token", extra={"source": "payload" if payload.token else ".env"}
+        )
     else:
-        print("❌ ERRO: Nenhum token GitHub configurado!")
-    
-    # Chama o serviço (Service Layer)
-    result = await download_and_extract(
-        github_url=payload.github_url, branch=payload.branch, token=github_token
-    )
+        log.warning("github_token_missing")
 
-    # Monta resposta enriquecida
-    return {
-        "status": "success",
-        # Metadados do GitHub
-        "repository": {
-            "info": result["github"]["metadata"],
-            "contributors": result["github"]["contributors"],
-            "branches": {
-                "count": result["github"]["branch_count"],
-                "list": result["github"]["branches"],
-            },
-            "languages": result["github"]["languages"],
-        },
-        # Estatísticas de arquivos
-        "file_analysis": {
-            "summary": {
-                "total_files": result["file_stats"]["total_files"],
-                "total_lines": result["file_stats"]["total_lines"],
-                "total_size": result["file_stats"]["total_size_human"],
-                "files_in_context": result["file_stats"].get("files_in_context", 0),
-                "total_analyzed": result["file_stats"].get("total_files_analyzed", 0),
-            },
-            "by_category": result["file_stats"]["by_category"],
-            "top_extensions": result["file_stats"]["by_extension"],
-        },
-        # Dependências
-        "dependencies": result["dependencies"],
-        # Estrutura de pastas
-        "directory_structure": result["directory_structure"],
-        # Contexto para IA (OTIMIZADO COM PRIORIZAÇÃO)
-        "context": {
-            "payload": result["payload"],
-            "total_chars": result["payload_chars"],
-            "max_chars": result.get("payload_max_chars", 48000),
-            "estimated_tokens": int(result["payload_chars"] / 4),
-            "files_in_context": result["file_stats"].get("files_in_context", 0),
-            "total_analyzed": result["file_stats"].get("total_files_analyzed", 0),
-            "included_files": result.get("included_files", []),
-        },
-        # Erros (se houver)
-        "errors": result["errors"],
-    }
+    # Chama o serviço (Service Layer). A resposta já serializada fica em
+    # cache junto com a extração: repetições do mesmo commit não passam de
+    # novo pela validação nem pela serialização do payload
+    _, body = await get_or_extract_derived(
+        github_url=payload.github_url,
+        branch=payload.branch,
+        token=github_token,
+        name="extract_response",
+        build=_build_extract_response,
+    )
+    return Response(content=body, media_type="application/json")
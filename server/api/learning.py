@@ -2,26 +2,38 @@
 API endpoints para recursos de aprendizado baseados em tecnologias.
 """
 
+import logging
+
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from typing import Annotated, List, Optional
+from core.error_sampler import should_log_trace
 from schemas.learning import LearningResourcesResponse
-from services.learning_service import generate_learning_resources
+from services.learning_service import (
+    dedupe_technologies,
+    generate_learning_resources,
+)
 
 router = APIRouter(tags=["Learning Resources"])
 
+log = logging.getLogger("nexo.learning")
+
 
 @router.get("/learning-resources", response_model=LearningResourcesResponse)
 async def get_learning_resources(
-    technologies: str = Query(
-        ...,
-        description="Lista de tecnologias separadas por vírgula (ex: 'TypeScript,React,Node.js')",
-        example="TypeScript,React,FastAPI",
-    ),
-    repo_context: Optional[str] = Query(
-        None,
-        description="Contexto adicional sobre o repositório para melhorar as sugestões",
-        max_length=500,
-    ),
+    technologies: Annotated[
+        str,
+        Query(
+            description="Lista de tecnologias separadas por vírgula (ex: 'TypeScript,React,Node.js')",
+            examples=["TypeScript,React,FastAPI"],
+        ),
+    ],
+    repo_context: Annotated[
+        Optional[str],
+        Query(
+            description="Contexto adicional sobre o repositório para melhorar as sugestões",
+            max_length=500,
+        ),
+    ] = None,
 ):
     """
     Gera recursos de aprendizado personalizados baseados nas tecnologias detectadas.
@@ -39,8 +51,10 @@ async def get_learning_resources(
     Returns:
         LearningResourcesResponse: Recursos de aprendizado organizados por tecnologia
     """
-    # Parse das tecnologias
-    tech_list = [tech.strip() for tech in technologies.split(",") if tech.strip()]
+    # Parse das tecnologias, sem repetições (ex.: "React,reactjs,REACT")
+    tech_list = dedupe_technologies(
+        [tech.strip() for tech in technologies.split(",") if tech.strip()]
+    )
 
     if not tech_list:
         raise HTTPException(
@@ -56,19 +70,19 @@ async def get_learning_resources(
 
     try:
         # Gera recursos de aprendizado
-        print(f"🎓 Gerando recursos de aprendizado para: {tech_list}")
+        log.info("learning_start", extra={"technologies": tech_list})
         result = await generate_learning_resources(
             technologies=tech_list,
             repo_context=repo_context or "",
         )
-        print(f"✅ Recursos gerados com sucesso!")
-        print(f"📦 Tipo do resultado: {type(result)}")
-        print(f"📦 Keys do resultado: {result.keys() if isinstance(result, dict) else 'N/A'}")
-        print(f"📦 Quantidade de recursos: {len(result.get('learning_resources', [])) if isinstance(result, dict) else 'N/A'}")
+        log.info(
+            "learning_done",
+            extra={"resources": len(result.get("learning_resources", []))},
+        )
 
         # Verifica se houve erro
         if "error" in result and not result["learning_resources"]:
-            print(f"❌ Erro nos recursos: {result['error']}")
+            log.warning("learning_failed", extra={"err": result["error"]})
             raise HTTPException(
                 status_code=500,
                 detail=f"Erro ao gerar recursos de aprendizado: {result['error']}",
@@ -79,9 +93,12 @@ async def get_learning_resources(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ ERRO INESPERADO no learning endpoint: {str(e)}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        # Traceback amostrado: no máximo um por minuto por tipo de exceção
+        log.error(
+            "learning_unexpected_error",
+            extra={"err": str(e), "type": type(e).__name__},
+            exc_info=should_log_trace(f"learning:{type(e).__name__}"),
+        )
         raise HTTPException(
             status_code=500,
             detail=f"Erro inesperado ao processar requisição: {str(e)}",
@@ -3,133 +3,138 @@ API de Overview - Gera resumos analíticos de repositórios usando IA.
 Combina extração de contexto com Gemini para criar onboarding inteligente.
 """
 
+import asyncio
+import hashlib
+import logging
+import uuid
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Union
+
+import orjson
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
+from core.config import settings
+from core.error_sampler import should_log_trace
+from core.prompt_template import PromptTemplate
+from core.tokens import count_tokens, fit_to_tokens
 from models.basic import RepoRequest
-from schemas.overview import OverviewResponseSchema
-from services.extract import download_and_extract
+from schemas.overview import (
+    OverviewBatchRequestSchema,
+    OverviewBatchResponseSchema,
+    OverviewJobSchema,
+    OverviewResponseSchema,
+)
+from services.cache import TTLCache
+from services.inflight import InflightRequests
+from services.extract import ExtractError
+from services.extract_cache import get_or_extract_derived
+from services.fallback_overview import (
+    MIN_CONTEXT_CHARS_FOR_AI,
+    NO_AI_USAGE,
+    is_complete_overview,
+    render_fallback_overview,
+)
 from services.gemini import gemini_service
+from services.gemini_batch import GeminiBatchQueue
 
 
 router = APIRouter(prefix="/overview", tags=["Overview IA"])
 
+log = logging.getLogger("nexo.overview")
+
+# Overviews gerados, por hash do prompt: o prompt é determinístico para um
+# mesmo commit (extração em cache por SHA), então repetições pulam o Gemini
+_overview_cache = TTLCache(
+    ttl_seconds=settings.ANALYZE_CACHE_TTL_SECONDS,
+    max_entries=settings.ANALYZE_CACHE_MAX_ENTRIES,
+)
+
+# Gerações em andamento, pela mesma chave: pedidos simultâneos para o mesmo
+# repositório aguardam uma única chamada ao Gemini
+_inflight_overviews = InflightRequests()
+
 
 # Prompt otimizado para gerar overview de onboarding em HTML
 OVERVIEW_PROMPT_TEMPLATE = """You are an expert in code analysis and technical communication.
 
-LANGUAGE: Your ENTIRE output MUST be in ENGLISH. If the source content (README, description, etc.) is in Portuguese, Spanish, or any other language, you MUST TRANSLATE everything to English in your response. No exceptions.
-
-Analyze the following repository and generate a **contextual overview** in pure HTML (to be rendered in React).
+Write a detailed, well-structured (800-1500 words) onboarding overview of the repository below in pure HTML (rendered in React). Your ENTIRE output MUST be in ENGLISH: translate any Portuguese, Spanish or other non-English source content.
 
-## Repository Information:
-- **Name:** {repo_name}
-- **Description:** {description}
-- **Stars:** {stars} ⭐ | **Forks:** {forks} 🍴
-- **Last Update:** {updated_at}
+## Repository Information
+- Name: {repo_name}
+- Description: {description}
+- Stars: {stars} ⭐ | Forks: {forks} 🍴
+- Last Update: {updated_at}
 
-## Context Files (README, configs, etc.):
+## Context Files (README, configs, etc.)
 {context_payload}
 
 ---
 
-## Your Task:
-Generate a **comprehensive, detailed, and well-structured overview** in HTML, focused on the GENERAL CONTEXT of the project.
-IMPORTANT: 
-- Make your response DETAILED and INFORMATIVE (aim for 800-1500 words)
-- Provide DEPTH in your explanations - don't be superficial
-- Include SPECIFIC examples and use cases when possible
-- Output must be 100% in English, translate any non-English content
-
-### HTML Structure (use semantic tags):
-
-1. **Title and Introduction**
-   - Use <h2> for the catchy title with emoji
-   - Use <p> for a welcome paragraph explaining what the project is
-
-2. **The Problem and the Solution**
-   - Use <h3> for section subtitles
-   - Use <p> for paragraphs explaining the problem and the solution
-
-3. **Main Features**
-   - Use <h3> for the section title
-   - Use <ul> and <li> to list features with emojis
-
-4. **Who Is This Project For?**
-   - Use <h3> for the title
-   - Use <p> to describe target audience and use cases
-
-5. **Getting Started** (IF there is information about installation/usage)
-   - Use <h3> for the title
-   - Use <ol> and <li> for numbered steps
-   - Only if there is clear information in README or configs
-
-6. **Final Considerations**
-   - Use <h3> for the title
-   - Use <p> for closing
-
-### IMPORTANT HTML formatting rules:
-- Use <strong> for important bold text
-- Use <em> for emphasis
-- Use <code> for inline technical terms
-- Use CSS classes for styling: class="overview-title", class="overview-section", class="feature-list", class="steps-list"
-- DO NOT include <html>, <head>, <body> tags - only the internal content
-- DO NOT use inline style attributes
-- DO NOT list languages, frameworks, or technical libraries
-- DO NOT show directory structure or folders
-- DO NOT make technical architecture analysis
-- FOCUS on general context, purpose, and project value
-- Be informative but accessible (not too technical)
-- Use emojis moderately to make it visually pleasant
-- Base yourself ONLY on the provided data
-- Return ONLY the HTML, without additional explanations or code blocks
-- IMPORTANT: If the source content is in Portuguese, TRANSLATE everything to English in the final output
-- All section titles, paragraphs, lists, and content must be in English
+## Sections (in order)
+1. <h2> catchy title with emoji, then a <p> welcome paragraph on what the project is
+2. <h3> The Problem and the Solution, with <p> paragraphs
+3. <h3> Main Features, as a <ul>/<li> list with emojis
+4. <h3> Who Is This Project For?, with <p> on target audience and use cases
+5. <h3> Getting Started, with <ol>/<li> steps - ONLY if the README or configs clearly describe installation/usage
+6. <h3> Final Considerations, with a closing <p>
+
+## Rules
+- Go in depth, with specific examples and use cases, while staying accessible
+- Focus on general context, purpose and project value: DO NOT list languages, frameworks or libraries, show directories, or analyze the architecture
+- Use <strong>, <em> and <code> inline, and the classes overview-title, overview-section, feature-list, steps-list; no inline style attributes
+- No <html>, <head> or <body> tags: return ONLY the HTML, without explanations or code blocks
+- Use emojis moderately and base yourself ONLY on the provided data
 """
 
+# Limite de tamanho do prompt enviado ao Gemini (em tokens; ~30k de entrada)
+MAX_PROMPT_TOKENS = 25000
 
-@router.post(
-    "/generate",
-    status_code=status.HTTP_200_OK,
-    response_model=OverviewResponseSchema,
-    summary="Gera overview de onboarding",
-    description="Extrai contexto do repositório e gera um resumo analítico usando Gemini.",
+# Folga reservada para o marcador de truncamento
+PROMPT_TOKEN_MARGIN = 125
+
+TRUNCATION_MARKER = "\n\n... [CONTEXTO TRUNCADO POR LIMITE DE TAMANHO] ..."
+
+# Template analisado uma única vez (na importação do módulo)
+OVERVIEW_PROMPT = PromptTemplate(OVERVIEW_PROMPT_TEMPLATE)
+
+
+# Parâmetros da geração (iguais nas versões normal e em streaming); respostas
+# longas e detalhadas, com timeout maior
+OVERVIEW_GENERATION = {"max_output_tokens": 5000, "temperature": 0.7, "timeout": 120.0}
+
+# Overviews sem pressa (/overview/enqueue) vão pela Batch API, com os mesmos
+# parâmetros de geração
+_overview_batches = GeminiBatchQueue(
+    max_output_tokens=OVERVIEW_GENERATION["max_output_tokens"],
+    temperature=OVERVIEW_GENERATION["temperature"],
 )
-async def generate_overview(payload: RepoRequest):
-    """
-    Endpoint que combina extração de repositório com geração de overview via IA.
 
-    1. Baixa e analisa o repositório (usa o serviço de extract)
-    2. Monta um prompt otimizado com o contexto
-    3. Chama o Gemini para gerar o overview em Markdown
-    4. Retorna o resultado formatado
-    """
-    # 1. Extrai o contexto do repositório
-    try:
-        extract_result = await download_and_extract(
-            github_url=payload.github_url,
-            branch=payload.branch,
-            token=payload.token,
-        )
-    except HTTPException as e:
-        return OverviewResponseSchema(
-            status="error",
-            repository_name=payload.github_url,
-            overview=None,
-            error=f"Erro na extração: {e.detail}",
-            usage=None,
-            context_stats=None,
-        )
-    except Exception as e:
-        return OverviewResponseSchema(
-            status="error",
-            repository_name=payload.github_url,
-            overview=None,
-            error=f"Erro inesperado na extração: {str(e)}",
-            usage=None,
-            context_stats=None,
-        )
+# Jobs de /overview/enqueue: a resposta pronta ou (nome do repositório,
+# estatísticas do contexto, chave do prompt, ID na fila da Batch API)
+_overview_jobs = TTLCache(
+    ttl_seconds=settings.GEMINI_BATCH_RESULT_TTL_SECONDS,
+    max_entries=100_000,
+)
 
-    # 2. Extrai informações para o prompt
+# Campos do evento final do streaming
+STREAM_DONE_FIELDS = ("status", "repository_name", "error", "usage", "context_stats")
+
+
+@lru_cache(maxsize=1)
+def _overview_static_tokens() -> int:
+    """Tokens do texto fixo do prompt (calculado uma vez)."""
+    return count_tokens(OVERVIEW_PROMPT.static_text)
+
+
+def _build_overview_prompt(extract_result: dict) -> tuple[str, str, int, int]:
+    """
+    Monta o prompt do overview a partir do resultado da extração.
+    Retorna (nome do repositório, prompt, tokens do contexto, tokens do prompt).
+    É determinístico, então o resultado fica guardado junto com a extração
+    em cache.
+    """
+    # Extrai informações para o prompt
     github_data = extract_result.get("github", {})
     metadata = github_data.get("metadata", {})
 
@@ -139,63 +144,161 @@ async def generate_overview(payload: RepoRequest):
     forks = metadata.get("forks", 0)
     updated_at = metadata.get("updated_at", "N/A")
 
-    # 3. Monta o prompt (simplificado, focado no contexto)
-    prompt = OVERVIEW_PROMPT_TEMPLATE.format(
+    # Limita o contexto ao orçamento de tokens que sobra depois do texto fixo
+    # e dos metadados (uma única codificação, que também dá a contagem)
+    header_tokens = count_tokens(f"{repo_name}{description}{stars}{forks}{updated_at}")
+    fixed_tokens = _overview_static_tokens() + header_tokens
+    context_payload, payload_tokens, truncated = fit_to_tokens(
+        extract_result.get("payload", "Nenhum contexto extraído"),
+        MAX_PROMPT_TOKENS - fixed_tokens - PROMPT_TOKEN_MARGIN,
+    )
+    prompt_tokens = fixed_tokens + payload_tokens
+    if truncated:
+        context_payload += TRUNCATION_MARKER
+        prompt_tokens = MAX_PROMPT_TOKENS
+
+    # Monta o prompt (simplificado, focado no contexto)
+    prompt = OVERVIEW_PROMPT.render(
         repo_name=repo_name,
         description=description,
         stars=stars,
         forks=forks,
         updated_at=updated_at,
-        context_payload=extract_result.get("payload", "Nenhum contexto extraído"),
+        context_payload=context_payload,
     )
 
-    # 4. Limita o prompt se necessário (Gemini tem limite de ~30k tokens input)
-    max_prompt_chars = 100000  # ~25k tokens
-    if len(prompt) > max_prompt_chars:
-        # Trunca o payload de contexto
-        excess = len(prompt) - max_prompt_chars
-        original_payload = extract_result.get("payload", "")
-        truncated_payload = original_payload[: len(original_payload) - excess - 500]
-        truncated_payload += "\n\n... [CONTEXTO TRUNCADO POR LIMITE DE TAMANHO] ..."
-
-        prompt = OVERVIEW_PROMPT_TEMPLATE.format(
-            repo_name=repo_name,
-            description=description,
-            stars=stars,
-            forks=forks,
-            updated_at=updated_at,
-            context_payload=truncated_payload,
-        )
+    return repo_name, prompt, payload_tokens, prompt_tokens
+
+
+def _error_response(
+    repo_name: str, error: str, context_stats: Optional[dict] = None
+) -> OverviewResponseSchema:
+    """
+    Resposta de erro do overview. Os valores vêm do próprio servidor, então
+    o modelo é montado sem validação (`model_construct`).
+    """
+    return OverviewResponseSchema.model_construct(
+        status="error",
+        repository_name=repo_name,
+        overview=None,
+        error=error,
+        usage=None,
+        context_stats=context_stats,
+    )
 
-    # 5. Chama o Gemini
-    gemini_result = await gemini_service.generate_content(
-        prompt=prompt,
-        max_output_tokens=5000,  # Increased for longer, more detailed overviews
-        temperature=0.7,
-        timeout=120.0,  # Timeout maior para respostas longas
+
+def extract_error_response(exc: ExtractError) -> OverviewResponseSchema:
+    """Resposta de erro do overview para uma falha na extração."""
+    return _error_response(exc.github_url or "", f"Erro na extração: {exc.detail}")
+
+
+async def _prepare_overview_or_error(
+    payload: RepoRequest,
+) -> Union[OverviewResponseSchema, tuple[str, str, dict]]:
+    """`_prepare_overview`, com a falha na extração como resposta pronta."""
+    try:
+        return await _prepare_overview(payload)
+    except ExtractError as e:
+        return extract_error_response(e)
+
+
+async def _prepare_overview(
+    payload: RepoRequest,
+) -> Union[OverviewResponseSchema, tuple[str, str, dict]]:
+    """
+    Extrai o contexto do repositório e monta o prompt (ambos em cache).
+    Retorna (nome do repositório, prompt, estatísticas do contexto) ou uma
+    resposta pronta: overview sem IA (pouco contexto).
+
+    Falhas na extração sobem como ExtractError: em /overview/generate, o
+    handler global as converte com `extract_error_response`.
+    """
+    extract_result, built_prompt = await get_or_extract_derived(
+        github_url=payload.github_url,
+        branch=payload.branch,
+        token=payload.token,
+        name="overview_prompt",
+        build=_build_overview_prompt,
     )
+    repo_name, prompt, payload_tokens, prompt_tokens = built_prompt
 
-    # 6. Monta a resposta
+    file_stats = extract_result.get("file_stats") or {}
+    payload_chars = extract_result.get("payload_chars", 0)
     context_stats = {
-        "files_analyzed": extract_result.get("file_stats", {}).get(
-            "files_in_context", 0
-        ),
-        "total_chars": extract_result.get("payload_chars", 0),
-        "estimated_tokens": extract_result.get("payload_chars", 0) // 4,
+        "files_analyzed": file_stats.get("files_in_context", 0),
+        "total_chars": payload_chars,
+        "estimated_tokens": payload_tokens,
         "prompt_chars": len(prompt),
-        "prompt_estimated_tokens": len(prompt) // 4,
+        "prompt_estimated_tokens": prompt_tokens,
     }
 
-    if not gemini_result["success"]:
+    # Sem contexto suficiente (ex.: repositório sem README/configs), a IA só
+    # produziria texto genérico: o overview sai direto dos metadados
+    if payload_chars < MIN_CONTEXT_CHARS_FOR_AI:
+        metadata = extract_result.get("github", {}).get("metadata") or {}
         return OverviewResponseSchema(
-            status="error",
+            status="success",
             repository_name=repo_name,
-            overview=None,
-            error=gemini_result["error"],
-            usage=None,
+            overview=render_fallback_overview(metadata),
+            error=None,
+            usage=NO_AI_USAGE,
             context_stats=context_stats,
         )
 
+    return repo_name, prompt, context_stats
+
+
+def _overview_key(prompt: str) -> bytes:
+    """Chave do overview no cache (o prompt inclui metadados e contexto)."""
+    return hashlib.sha256(prompt.encode()).digest()
+
+
+async def _generate_and_cache(key: bytes, prompt: str) -> dict:
+    """Chama o Gemini e guarda o overview no cache se a geração deu certo."""
+    gemini_result = await gemini_service.generate_content_checked(
+        prompt, is_complete_overview, **OVERVIEW_GENERATION
+    )
+    if gemini_result["success"]:
+        _overview_cache.set(key, (gemini_result["content"], gemini_result.get("usage")))
+    return gemini_result
+
+
+@router.post(
+    "/generate",
+    status_code=status.HTTP_200_OK,
+    response_model=OverviewResponseSchema,
+    summary="Gera overview de onboarding",
+    description="Extrai contexto do repositório e gera um resumo analítico usando Gemini.",
+)
+async def generate_overview(payload: RepoRequest):
+    """
+    Endpoint que combina extração de repositório com geração de overview via IA.
+
+    1. Baixa e analisa o repositório (usa o serviço de extract)
+    2. Monta um prompt otimizado com o contexto
+    3. Chama o Gemini para gerar o overview em Markdown
+    4. Retorna o resultado formatado
+    """
+    # 1. Extrai o contexto do repositório e monta o prompt (ou já tem a resposta)
+    prepared = await _prepare_overview(payload)
+    if isinstance(prepared, OverviewResponseSchema):
+        return prepared
+    repo_name, prompt, context_stats = prepared
+
+    # 2. Chama o Gemini (ou reaproveita o overview do mesmo prompt)
+    key = _overview_key(prompt)
+    cached = _overview_cache.get(key)
+    if cached is not None:
+        gemini_result = {"success": True, "content": cached[0], "usage": cached[1]}
+    else:
+        gemini_result = await _inflight_overviews.run(
+            key, lambda: _generate_and_cache(key, prompt)
+        )
+
+    # 3. Monta a resposta
+    if not gemini_result["success"]:
+        return _error_response(repo_name, gemini_result["error"], context_stats)
+
     return OverviewResponseSchema(
         status="success",
         repository_name=repo_name,
@@ -204,3 +307,225 @@ async def generate_overview(payload: RepoRequest):
         usage=gemini_result.get("usage"),
         context_stats=context_stats,
     )
+
+
+@router.post(
+    "/generate_batch",
+    status_code=status.HTTP_200_OK,
+    response_model=OverviewBatchResponseSchema,
+    summary="Gera overviews de vários repositórios",
+    description="Executa /overview/generate para cada item (concorrência limitada).",
+)
+async def generate_overview_batch(payload: OverviewBatchRequestSchema):
+    """
+    Gera os overviews em paralelo, no máximo `max_concurrency` por vez.
+    As chamadas ao Gemini continuam sujeitas ao limite global do serviço;
+    repetições aproveitam o cache e o agrupamento de /overview/generate.
+    """
+    semaphore = asyncio.Semaphore(payload.max_concurrency)
+
+    async def generate_one(item: RepoRequest) -> OverviewResponseSchema:
+        async with semaphore:
+            return await generate_overview(item)
+
+    results = await asyncio.gather(
+        *(generate_one(item) for item in payload.items), return_exceptions=True
+    )
+
+    # Uma falha inesperada em um item não derruba o lote inteiro
+    responses = []
+    for item, result in zip(payload.items, results):
+        if isinstance(result, ExtractError):
+            result = extract_error_response(result)
+        elif isinstance(result, Exception):
+            trace = should_log_trace(f"overview_batch:{type(result).__name__}")
+            log.error(
+                "batch_item_failed",
+                extra={"url": item.github_url, "err": str(result)},
+                exc_info=result if trace else None,
+            )
+            result = _error_response(item.github_url, f"Erro inesperado: {str(result)}")
+        responses.append(result)
+
+    return OverviewBatchResponseSchema(results=responses)
+
+
+@router.post(
+    "/enqueue",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=OverviewJobSchema,
+    summary="Agenda a geração de um overview",
+    description=(
+        "Gera o overview em segundo plano pela Batch API do Gemini (custo "
+        "menor, pode levar minutos). Consulte com /overview/result/{job_id}."
+    ),
+)
+async def enqueue_overview(payload: RepoRequest):
+    """
+    Versão assíncrona de /overview/generate, para pré-calcular overviews.
+    A extração roda agora; só a geração pela IA fica para o lote.
+    """
+    job_id = uuid.uuid4().hex
+    prepared = await _prepare_overview_or_error(payload)
+    if isinstance(prepared, OverviewResponseSchema):
+        _overview_jobs.set(job_id, prepared)
+        return OverviewJobSchema(job_id=job_id, status="done", result=prepared)
+
+    repo_name, prompt, context_stats = prepared
+    key = _overview_key(prompt)
+    cached = _overview_cache.get(key)
+    if cached is not None:
+        response = OverviewResponseSchema(
+            status="success",
+            repository_name=repo_name,
+            overview=cached[0],
+            error=None,
+            usage=cached[1],
+            context_stats=context_stats,
+        )
+        _overview_jobs.set(job_id, response)
+        return OverviewJobSchema(job_id=job_id, status="done", result=response)
+
+    batch_id = _overview_batches.submit(prompt)
+    _overview_jobs.set(job_id, (repo_name, context_stats, key, batch_id))
+    return OverviewJobSchema(job_id=job_id, status="pending")
+
+
+@router.get(
+    "/result/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=OverviewJobSchema,
+    summary="Consulta um overview agendado",
+    description="Resultado de /overview/enqueue (status pending até o lote concluir).",
+)
+async def get_overview_result(job_id: str):
+    """Retorna o overview agendado, se o lote da Batch API já concluiu."""
+    job = _overview_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado ou expirado",
+        )
+    if isinstance(job, OverviewResponseSchema):
+        return OverviewJobSchema(job_id=job_id, status="done", result=job)
+
+    repo_name, context_stats, key, batch_id = job
+    found, gemini_result = _overview_batches.result(batch_id)
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado ou expirado",
+        )
+    if gemini_result is None:
+        return OverviewJobSchema(job_id=job_id, status="pending")
+
+    if not gemini_result["success"]:
+        response = _error_response(repo_name, gemini_result["error"], context_stats)
+    else:
+        # Só overviews completos entram no cache compartilhado com
+        # /overview/generate (que refaria os incompletos com o fallback)
+        if is_complete_overview(gemini_result["content"]):
+            _overview_cache.set(
+                key, (gemini_result["content"], gemini_result.get("usage"))
+            )
+        response = OverviewResponseSchema(
+            status="success",
+            repository_name=repo_name,
+            overview=gemini_result["content"],
+            error=None,
+            usage=gemini_result.get("usage"),
+            context_stats=context_stats,
+        )
+    _overview_jobs.set(job_id, response)
+    return OverviewJobSchema(job_id=job_id, status="done", result=response)
+
+
+def _sse(event: dict) -> bytes:
+    """Serializa um evento no formato Server-Sent Events."""
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+async def _stream_overview(
+    prepared: Union[OverviewResponseSchema, tuple[str, str, dict]],
+) -> AsyncIterator[bytes]:
+    """Gera os eventos SSE do overview em streaming."""
+    # Resposta pronta (erro na extração ou overview sem IA): o overview, se
+    # houver, vai em um único trecho, seguido do evento final
+    if isinstance(prepared, OverviewResponseSchema):
+        data = prepared.model_dump(mode="json")
+        if data["overview"]:
+            yield _sse({"event": "chunk", "chunk": data["overview"]})
+        yield _sse({"event": "done", **{k: data[k] for k in STREAM_DONE_FIELDS}})
+        return
+
+    repo_name, prompt, context_stats = prepared
+    yield _sse(
+        {"event": "start", "repository_name": repo_name, "context_stats": context_stats}
+    )
+
+    usage = None
+    error = None
+    key = _overview_key(prompt)
+    cached = _overview_cache.get(key)
+    if cached is not None:
+        # Overview já gerado: um único trecho com o texto completo
+        content, usage = cached
+        yield _sse({"event": "chunk", "chunk": content})
+    else:
+        chunks = []
+        async for event in gemini_service.generate_content_stream(
+            prompt=prompt, **OVERVIEW_GENERATION
+        ):
+            if event["type"] == "delta":
+                chunks.append(event["text"])
+                yield _sse({"event": "chunk", "chunk": event["text"]})
+            elif event["type"] == "done":
+                usage = event.get("usage")
+            else:
+                error = event.get("error", "Erro desconhecido na geração do overview")
+        content = "".join(chunks)
+        # Overview truncado não entra no cache: /overview/generate o refaria
+        # com o modelo de fallback
+        if not error and is_complete_overview(content):
+            _overview_cache.set(key, (content, usage))
+
+    # O uso de tokens só é conhecido no fim da geração
+    yield _sse(
+        {
+            "event": "done",
+            "status": "error" if error else "success",
+            "repository_name": repo_name,
+            "error": error,
+            "usage": usage,
+            "context_stats": context_stats,
+        }
+    )
+
+
+@router.post(
+    "/generate/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Gera overview de onboarding (streaming)",
+    description=(
+        "Mesmo overview de /generate, enviado via Server-Sent Events à medida "
+        "que a IA o gera."
+    ),
+    response_class=StreamingResponse,
+)
+async def generate_overview_stream(payload: RepoRequest):
+    """
+    Versão em streaming de `/overview/generate` (text/event-stream).
+
+    Cada evento é uma linha `data: {...}`:
+    - `{"event": "start", "repository_name": ..., "context_stats": ...}`
+    - `{"event": "chunk", "chunk": "..."}` - trecho do overview (0..n vezes);
+      o cliente concatena os trechos
+    - `{"event": "done", "status": ..., "repository_name": ..., "error": ...,
+      "usage": ..., "context_stats": ...}` - sempre o último evento
+    """
+    prepared = await _prepare_overview_or_error(payload)
+    return StreamingResponse(
+        _stream_overview(prepared),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
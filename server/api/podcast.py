@@ -3,11 +3,14 @@ Podcast generation API endpoints
 Handles ElevenLabs integration for repository explanation podcasts
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import Response, FileResponse
-from typing import Optional
+from typing import Any, Optional
+import hashlib
+import os
 import uuid
-import asyncio
+
+import orjson
 from datetime import datetime
 from pathlib import Path
 
@@ -15,23 +18,54 @@ from schemas.podcast import (
     GeneralPodcastRequest,
     SpecificPodcastRequest,
     PodcastResponse,
+    PodcastJobResponse,
     PodcastStatus,
     RepositoryAnalysis
 )
 from services.elevenlabs_service import elevenlabs_service
+from services.inflight import InflightRequests
+from services.podcast_queue import podcast_queue
+from services.podcast_store import podcast_store
 from services.repo_analyzer import analyze_github_repo
-from core.config import settings
 
 router = APIRouter()
 
-# In-memory storage for podcast generation status (use Redis in production)
-podcast_status_store = {}
+# General podcasts being generated, by content id: concurrent requests for
+# the same repository share a single ElevenLabs generation
+_inflight_podcasts = InflightRequests()
+
+
+def _content_id(*parts: Any) -> str:
+    """
+    Content-addressed podcast id (sha256 of the canonical JSON of the inputs):
+    the same inputs always map to the same audio file
+    """
+    data = orjson.dumps(list(parts), option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+async def _generate_general_audio(
+    podcast_id: str, repo_analysis: dict, script: Optional[str] = None
+) -> str:
+    """Generate a general podcast audio file, unless it already exists"""
+    output_path = f"podcasts/general_{podcast_id}.mp3"
+    if Path(output_path).exists():
+        return output_path
+    
+    # Ensure podcasts directory exists
+    Path("podcasts").mkdir(exist_ok=True)
+    
+    await elevenlabs_service.generate_general_podcast(
+        repo_analysis=repo_analysis,
+        output_path=output_path,
+        script=script
+    )
+    return output_path
 
 
 @router.post("/generate/general", response_model=PodcastResponse)
 async def generate_general_podcast(
-    request: GeneralPodcastRequest,
-    background_tasks: BackgroundTasks
+    request: GeneralPodcastRequest
 ):
     """
     Generate a comprehensive podcast explaining the entire repository
@@ -63,22 +97,17 @@ async def generate_general_podcast(
         else:
             repo_analysis = request.repo_analysis.model_dump()
         
-        # Generate unique filename
-        podcast_id = uuid.uuid4().hex[:8]
-        output_path = f"podcasts/general_{podcast_id}.mp3"
-        
-        # Ensure podcasts directory exists
-        Path("podcasts").mkdir(exist_ok=True)
+        # Build the script once: used for the audio and returned for reference
+        script = elevenlabs_service.create_general_podcast_prompt(repo_analysis)
         
-        # Generate podcast
-        audio_data = await elevenlabs_service.generate_general_podcast(
-            repo_analysis=repo_analysis,
-            output_path=output_path
+        # Generate podcast (or reuse the audio of the same inputs, finished or
+        # still being generated)
+        podcast_id = _content_id(request.repository_url, repo_analysis)
+        output_path = await _inflight_podcasts.run(
+            podcast_id,
+            lambda: _generate_general_audio(podcast_id, repo_analysis, script)
         )
         
-        # Get the script for reference
-        script = elevenlabs_service.create_general_podcast_prompt(repo_analysis)
-        
         return PodcastResponse(
             success=True,
             message="General repository podcast generated successfully",
@@ -96,8 +125,7 @@ async def generate_general_podcast(
 
 @router.post("/generate/specific", response_model=PodcastResponse)
 async def generate_specific_podcast(
-    request: SpecificPodcastRequest,
-    background_tasks: BackgroundTasks
+    request: SpecificPodcastRequest
 ):
     """
     Generate a focused podcast explaining a specific aspect of the repository
@@ -124,29 +152,36 @@ async def generate_specific_podcast(
                 detail="AI response is required. Please get an answer from Gemini first."
             )
         
-        # Generate podcast
-        output_path = None
-        if request.save_to_file:
-            output_path = f"podcasts/specific_{uuid.uuid4().hex[:8]}.mp3"
-        
-        audio_data = await elevenlabs_service.generate_specific_podcast(
-            question=request.question,
-            context=request.context or "",
-            analysis_response=request.ai_response,
-            output_path=output_path
-        )
-        
-        # Get the script for reference
+        # Build the script once: used for the audio and returned for reference
         script = elevenlabs_service.create_specific_topic_prompt(
             request.question,
             request.context or "",
             request.ai_response
         )
         
+        # Generate podcast (skipped if the same inputs were already saved)
+        output_path = None
+        if request.save_to_file:
+            podcast_id = _content_id(
+                request.question, request.context or "", request.ai_response
+            )
+            output_path = f"podcasts/specific_{podcast_id}.mp3"
+        
+        if output_path is None or not Path(output_path).exists():
+            if output_path is not None:
+                Path("podcasts").mkdir(exist_ok=True)
+            await elevenlabs_service.generate_specific_podcast(
+                question=request.question,
+                context=request.context or "",
+                analysis_response=request.ai_response,
+                output_path=output_path,
+                script=script
+            )
+        
         return PodcastResponse(
             success=True,
             message="Specific topic podcast generated successfully",
-            audio_url=f"/api/v1/podcast/audio/{output_path}" if output_path else None,
+            audio_url=f"/api/v1/podcast/audio/{podcast_id}" if output_path else None,
             file_path=output_path,
             script=script
         )
@@ -158,10 +193,9 @@ async def generate_specific_podcast(
         )
 
 
-@router.post("/generate/async/general")
+@router.post("/generate/async/general", response_model=PodcastJobResponse)
 async def generate_general_podcast_async(
-    request: GeneralPodcastRequest,
-    background_tasks: BackgroundTasks
+    request: GeneralPodcastRequest
 ):
     """
     Start asynchronous generation of general repository podcast
@@ -170,33 +204,29 @@ async def generate_general_podcast_async(
     Useful for long-running podcast generation.
     
     Returns:
-        Dict with podcast_id and status_url
+        PodcastJobResponse with podcast_id and status_url
     """
     podcast_id = str(uuid.uuid4())
     
-    podcast_status_store[podcast_id] = {
-        "status": "pending",
-        "progress": 0,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    background_tasks.add_task(
-        _generate_general_podcast_background,
+    await podcast_store.update(
         podcast_id,
-        request
+        status="pending",
+        progress=0,
+        created_at=datetime.utcnow().isoformat()
     )
     
-    return {
-        "podcast_id": podcast_id,
-        "status": "pending",
-        "status_url": f"/api/v1/podcast/status/{podcast_id}"
-    }
+    await podcast_queue.enqueue("general", podcast_id, request.model_dump())
+    
+    return PodcastJobResponse(
+        podcast_id=podcast_id,
+        status="pending",
+        status_url=f"/api/v1/podcast/status/{podcast_id}"
+    )
 
 
-@router.post("/generate/async/specific")
+@router.post("/generate/async/specific", response_model=PodcastJobResponse)
 async def generate_specific_podcast_async(
-    request: SpecificPodcastRequest,
-    background_tasks: BackgroundTasks
+    request: SpecificPodcastRequest
 ):
     """
     Start asynchronous generation of specific topic podcast
@@ -204,27 +234,24 @@ async def generate_specific_podcast_async(
     Returns immediately with a podcast_id to check status later.
     
     Returns:
-        Dict with podcast_id and status_url
+        PodcastJobResponse with podcast_id and status_url
     """
     podcast_id = str(uuid.uuid4())
     
-    podcast_status_store[podcast_id] = {
-        "status": "pending",
-        "progress": 0,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    background_tasks.add_task(
-        _generate_specific_podcast_background,
+    await podcast_store.update(
         podcast_id,
-        request
+        status="pending",
+        progress=0,
+        created_at=datetime.utcnow().isoformat()
     )
     
-    return {
-        "podcast_id": podcast_id,
-        "status": "pending",
-        "status_url": f"/api/v1/podcast/status/{podcast_id}"
-    }
+    await podcast_queue.enqueue("specific", podcast_id, request.model_dump())
+    
+    return PodcastJobResponse(
+        podcast_id=podcast_id,
+        status="pending",
+        status_url=f"/api/v1/podcast/status/{podcast_id}"
+    )
 
 
 @router.get("/status/{podcast_id}", response_model=PodcastStatus)
@@ -238,11 +265,10 @@ async def get_podcast_status(podcast_id: str):
     Returns:
         PodcastStatus with current progress and result
     """
-    if podcast_id not in podcast_status_store:
+    status_data = await podcast_store.get(podcast_id)
+    if status_data is None:
         raise HTTPException(status_code=404, detail="Podcast ID not found")
     
-    status_data = podcast_status_store[podcast_id]
-    
     return PodcastStatus(
         podcast_id=podcast_id,
         status=status_data["status"],
@@ -252,11 +278,23 @@ async def get_podcast_status(podcast_id: str):
     )
 
 
+def _stat_audio(path: Path) -> Optional[os.stat_result]:
+    """stat() the audio file, or None if it does not exist"""
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+
 @router.get("/audio/{podcast_id}")
 async def get_podcast_audio(podcast_id: str):
     """
     Stream or download the generated podcast audio file
     
+    FileResponse honours Range requests (206 + Accept-Ranges/ETag), so
+    players can seek without downloading the whole file again. The stat()
+    used to find the file is handed to it instead of being repeated.
+    
     Args:
         podcast_id: Unique podcast identifier or 'demo' for demo file
         
@@ -266,98 +304,107 @@ async def get_podcast_audio(podcast_id: str):
     # Handle demo file request
     if podcast_id == "demo":
         demo_path = Path("podcasts/test_general.mp3")
-        if demo_path.exists():
+        stat_result = _stat_audio(demo_path)
+        if stat_result is not None:
             return FileResponse(
                 demo_path,
+                stat_result=stat_result,
                 media_type="audio/mpeg",
                 filename="nexo_demo_podcast.mp3"
             )
     
     file_path = Path(f"podcasts/general_{podcast_id}.mp3")
+    stat_result = _stat_audio(file_path)
     
-    if not file_path.exists():
+    if stat_result is None:
         # Try specific podcast
         file_path = Path(f"podcasts/specific_{podcast_id}.mp3")
+        stat_result = _stat_audio(file_path)
     
-    if not file_path.exists():
+    if stat_result is None:
         raise HTTPException(status_code=404, detail="Podcast audio not found")
     
     return FileResponse(
         file_path,
+        stat_result=stat_result,
         media_type="audio/mpeg",
         filename=f"podcast_{podcast_id}.mp3"
     )
 
 
-async def _generate_general_podcast_background(
-    podcast_id: str,
-    request: GeneralPodcastRequest
-):
-    """Background task for generating general podcast"""
+async def _generate_general_podcast_background(podcast_id: str, payload: dict):
+    """Queued job for generating general podcast (payload: GeneralPodcastRequest)"""
     try:
-        podcast_status_store[podcast_id]["status"] = "processing"
-        podcast_status_store[podcast_id]["progress"] = 25
-        
+        request = GeneralPodcastRequest.model_validate(payload)
         if not request.repo_analysis:
             raise ValueError("Repository analysis is required")
         
         repo_analysis = request.repo_analysis.model_dump()
         
-        podcast_status_store[podcast_id]["progress"] = 50
+        # One status write per transition (a single round trip with Redis)
+        await podcast_store.update(podcast_id, status="processing", progress=50)
         
-        output_path = f"podcasts/general_{podcast_id[:8]}.mp3"
-        await elevenlabs_service.generate_general_podcast(
-            repo_analysis=repo_analysis,
-            output_path=output_path
+        content_id = _content_id(request.repository_url, repo_analysis)
+        output_path = await _inflight_podcasts.run(
+            content_id, lambda: _generate_general_audio(content_id, repo_analysis)
         )
         
-        podcast_status_store[podcast_id].update({
-            "status": "completed",
-            "progress": 100,
-            "audio_url": f"/api/v1/podcast/audio/{output_path}",
-            "file_path": output_path
-        })
+        await podcast_store.update(
+            podcast_id,
+            status="completed",
+            progress=100,
+            audio_url=f"/api/v1/podcast/audio/{content_id}",
+            file_path=output_path
+        )
         
     except Exception as e:
-        podcast_status_store[podcast_id].update({
-            "status": "failed",
-            "progress": 0,
-            "error": str(e)
-        })
+        await podcast_store.update(
+            podcast_id,
+            status="failed",
+            progress=0,
+            error=str(e)
+        )
 
 
-async def _generate_specific_podcast_background(
-    podcast_id: str,
-    request: SpecificPodcastRequest
-):
-    """Background task for generating specific podcast"""
+async def _generate_specific_podcast_background(podcast_id: str, payload: dict):
+    """Queued job for generating specific podcast (payload: SpecificPodcastRequest)"""
     try:
-        podcast_status_store[podcast_id]["status"] = "processing"
-        podcast_status_store[podcast_id]["progress"] = 25
-        
+        request = SpecificPodcastRequest.model_validate(payload)
         if not request.ai_response:
             raise ValueError("AI response is required")
         
-        podcast_status_store[podcast_id]["progress"] = 50
+        # One status write per transition (a single round trip with Redis)
+        await podcast_store.update(podcast_id, status="processing", progress=50)
         
-        output_path = f"podcasts/specific_{podcast_id[:8]}.mp3"
-        await elevenlabs_service.generate_specific_podcast(
-            question=request.question,
-            context=request.context or "",
-            analysis_response=request.ai_response,
-            output_path=output_path
+        content_id = _content_id(
+            request.question, request.context or "", request.ai_response
         )
+        output_path = f"podcasts/specific_{content_id}.mp3"
+        if not Path(output_path).exists():
+            Path("podcasts").mkdir(exist_ok=True)
+            await elevenlabs_service.generate_specific_podcast(
+                question=request.question,
+                context=request.context or "",
+                analysis_response=request.ai_response,
+                output_path=output_path
+            )
         
-        podcast_status_store[podcast_id].update({
-            "status": "completed",
-            "progress": 100,
-            "audio_url": f"/api/v1/podcast/audio/{output_path}",
-            "file_path": output_path
-        })
+        await podcast_store.update(
+            podcast_id,
+            status="completed",
+            progress=100,
+            audio_url=f"/api/v1/podcast/audio/{content_id}",
+            file_path=output_path
+        )
         
     except Exception as e:
-        podcast_status_store[podcast_id].update({
-            "status": "failed",
-            "progress": 0,
-            "error": str(e)
-        })
+        await podcast_store.update(
+            podcast_id,
+            status="failed",
+            progress=0,
+            error=str(e)
+        )
+
+
+podcast_queue.register("general", _generate_general_podcast_background)
+podcast_queue.register("specific", _generate_specific_podcast_background)
@@ -2,8 +2,12 @@
 API de repositórios salvos do usuário
 """
 
+import asyncio
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from bson import ObjectId
+from pymongo import ReturnDocument, WriteConcern
 
 from schemas.saved_repo import (
     SaveRepoRequest,
@@ -20,6 +24,38 @@ from services.database import get_database
 router = APIRouter(prefix="/repos", tags=["Repositórios Salvos"])
 
 
+def _is_filled(field: str) -> dict:
+    """Expressão de agregação: o campo existe e não é nulo nem vazio."""
+    return {"$ne": [{"$ifNull": [f"${field}", ""]}, ""]}
+
+
+def parse_repo_id(repo_id: str) -> ObjectId:
+    """Dependência: converte o repo_id da rota em ObjectId (400 se inválido)."""
+    # is_valid evita o custo de lançar e capturar a exceção do ObjectId
+    if not ObjectId.is_valid(repo_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ID de repositório inválido",
+        )
+    return ObjectId(repo_id)
+
+
+# Campos da listagem resumida. Overview, script do podcast e análises são os
+# maiores campos do documento: só se calcula no servidor se estão preenchidos
+SUMMARY_PROJECTION = {
+    "repo_url": 1,
+    "repo_name": 1,
+    "repo_full_name": 1,
+    "description": 1,
+    "stars": 1,
+    "forks": 1,
+    "language": 1,
+    "created_at": 1,
+    "has_overview": _is_filled("overview"),
+    "has_podcast": _is_filled("podcast_url"),
+}
+
+
 @router.post(
     "/save", response_model=SavedRepoResponse, status_code=status.HTTP_201_CREATED
 )
@@ -35,14 +71,6 @@ async def save_repository(
     db = get_database()
     collection = db.saved_repos
 
-    # Verifica se já existe
-    existing_repo = await collection.find_one(
-        {
-            "user_id": current_user.id,
-            "repo_url": repo_data.repo_url,
-        }
-    )
-
     repo_dict = SavedRepoModel.to_dict(
         user_id=current_user.id,
         repo_url=repo_data.repo_url,
@@ -60,15 +88,18 @@ async def save_repository(
         dependencies=repo_data.dependencies,
     )
 
-    if existing_repo:
-        # Atualiza mantendo o created_at original
-        repo_dict["created_at"] = existing_repo["created_at"]
-        await collection.update_one({"_id": existing_repo["_id"]}, {"$set": repo_dict})
-        repo_dict["_id"] = str(existing_repo["_id"])
-    else:
-        # Insere novo
-        result = await collection.insert_one(repo_dict)
-        repo_dict["_id"] = str(result.inserted_id)
+    # Insere ou atualiza em uma única operação (upsert); o created_at só é
+    # gravado na inserção, então uma atualização mantém o original
+    created_at = repo_dict.pop("created_at")
+    saved = await collection.find_one_and_update(
+        {"user_id": current_user.id, "repo_url": repo_data.repo_url},
+        {"$set": repo_dict, "$setOnInsert": {"created_at": created_at}},
+        projection={"created_at": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    repo_dict["created_at"] = saved["created_at"]
+    repo_dict["_id"] = str(saved["_id"])
 
     return SavedRepoResponse(**repo_dict)
 
@@ -85,17 +116,24 @@ async def list_saved_repositories(
     db = get_database()
     collection = db.saved_repos
 
-    # Busca repositórios do usuário
-    cursor = (
-        collection.find({"user_id": current_user.id})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
+    # Busca repositórios do usuário, só com os campos do resumo
+    pipeline = [
+        {"$match": {"user_id": current_user.id}},
+        {"$sort": {"created_at": -1}},
+        {"$skip": skip},
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": SUMMARY_PROJECTION})
+
+    # Página e contagem total são independentes: rodam em paralelo
+    docs, total = await asyncio.gather(
+        collection.aggregate(pipeline).to_list(length=limit or None),
+        collection.count_documents({"user_id": current_user.id}),
     )
 
-    repos = []
-    async for repo in cursor:
-        repo_summary = SavedRepoSummary(
+    repos = [
+        SavedRepoSummary(
             _id=str(repo["_id"]),
             repo_url=repo["repo_url"],
             repo_name=repo["repo_name"],
@@ -104,21 +142,19 @@ async def list_saved_repositories(
             stars=repo.get("stars", 0),
             forks=repo.get("forks", 0),
             language=repo.get("language"),
-            has_overview=bool(repo.get("overview")),
-            has_podcast=bool(repo.get("podcast_url")),
+            has_overview=repo["has_overview"],
+            has_podcast=repo["has_podcast"],
             created_at=repo["created_at"],
         )
-        repos.append(repo_summary)
-
-    # Conta total
-    total = await collection.count_documents({"user_id": current_user.id})
+        for repo in docs
+    ]
 
     return SavedRepoListSummaryResponse(repos=repos, total=total)
 
 
 @router.get("/{repo_id}", response_model=SavedRepoResponse)
 async def get_saved_repository(
-    repo_id: str,
+    obj_id: ObjectId = Depends(parse_repo_id),
     current_user: UserResponse = Depends(get_current_user),
 ):
     """
@@ -127,14 +163,6 @@ async def get_saved_repository(
     db = get_database()
     collection = db.saved_repos
 
-    try:
-        obj_id = ObjectId(repo_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="ID de repositório inválido",
-        )
-
     repo = await collection.find_one(
         {
             "_id": obj_id,
@@ -154,7 +182,7 @@ async def get_saved_repository(
 
 @router.delete("/{repo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_saved_repository(
-    repo_id: str,
+    obj_id: ObjectId = Depends(parse_repo_id),
     current_user: UserResponse = Depends(get_current_user),
 ):
     """
@@ -163,14 +191,6 @@ async def delete_saved_repository(
     db = get_database()
     collection = db.saved_repos
 
-    try:
-        obj_id = ObjectId(repo_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="ID de repositório inválido",
-        )
-
     result = await collection.delete_one(
         {
             "_id": obj_id,
@@ -189,7 +209,7 @@ async def delete_saved_repository(
 
 @router.patch("/{repo_id}/podcast", response_model=SavedRepoResponse)
 async def update_podcast_info(
-    repo_id: str,
+    obj_id: ObjectId = Depends(parse_repo_id),
     podcast_url: str = None,
     podcast_script: str = None,
     current_user: UserResponse = Depends(get_current_user),
@@ -200,14 +220,6 @@ async def update_podcast_info(
     db = get_database()
     collection = db.saved_repos
 
-    try:
-        obj_id = ObjectId(repo_id)
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="ID de repositório inválido",
-        )
-
     update_data = {}
     if podcast_url is not None:
         update_data["podcast_url"] = podcast_url
@@ -220,20 +232,23 @@ async def update_podcast_info(
             detail="Nenhum dado para atualizar",
         )
 
-    from datetime import datetime
+    update_data["updated_at"] = datetime.now(timezone.utc)
 
-    update_data["updated_at"] = datetime.utcnow()
-
-    result = await collection.update_one(
-        {"_id": obj_id, "user_id": current_user.id}, {"$set": update_data}
+    # Atualiza e retorna o documento em uma única ida ao banco. Dado não
+    # crítico: confirma a escrita sem esperar o journal (fsync)
+    repo = await collection.with_options(
+        write_concern=WriteConcern(w=1, j=False)
+    ).find_one_and_update(
+        {"_id": obj_id, "user_id": current_user.id},
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER,
     )
 
-    if result.matched_count == 0:
+    if not repo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Repositório não encontrado",
         )
 
-    repo = await collection.find_one({"_id": obj_id})
     repo["_id"] = str(repo["_id"])
     return SavedRepoResponse(**repo)
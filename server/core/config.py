@@ -2,6 +2,8 @@
 Configurações da aplicação
 """
 
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -11,32 +13,101 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "nexo_db"
+    # Pool de conexões e compressão do tráfego (documentos com análises e
+    # overviews grandes); o servidor usa o primeiro compressor que suportar
+    MONGODB_MAX_POOL_SIZE: int = 200
+    MONGODB_MIN_POOL_SIZE: int = 20
+    MONGODB_COMPRESSORS: str = "zstd,zlib"
 
     # JWT - Configurações de Segurança
     SECRET_KEY: str = "nexo-secret-key-change-in-production-2026"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096  # Tokens já validados em cache
 
     # Segurança
     MAX_LOGIN_ATTEMPTS: int = 5  # Máximo de tentativas de login
     LOCKOUT_DURATION_MINUTES: int = 15  # Tempo de bloqueio após tentativas
     PASSWORD_MIN_LENGTH: int = 8
+    # Custos do argon2id (hash das senhas)
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST_KIB: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 2
+    # Uma tentativa de login que falhou (mesmo email e senha) é recusada sem
+    # repetir o hash da senha (argon2id) durante este tempo
+    LOGIN_FAILURE_CACHE_TTL_SECONDS: int = 60
+    LOGIN_FAILURE_CACHE_MAX_ENTRIES: int = 10000
 
     # Gemini API
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-2.5-flash"
+    # Modelo para uma nova tentativa quando a resposta do principal não passa
+    # na validação do endpoint. Vazio (padrão) desativa: a nova tentativa
+    # cobra o prompt inteiro de novo (ex.: "gemini-2.5-pro" só por opção)
+    GEMINI_FALLBACK_MODEL: str = ""
     GEMINI_MAX_TOKENS: int = 8192
+    GEMINI_GZIP_MIN_BYTES: int = 8192  # Comprime corpos maiores (0 desativa)
+    GEMINI_MAX_CONCURRENT: int = 8  # Chamadas simultâneas ao Gemini
+    GEMINI_QUEUE_TIMEOUT_SECONDS: float = 5.0  # Espera máxima por uma vaga
+    GEMINI_REQUESTS_PER_MINUTE: int = 500  # Cota da API por minuto (0 desativa)
+    # Batch API (overviews sem pressa, custo menor): prompts por lote, espera
+    # máxima para completar um lote, intervalo entre consultas e validade
+    # dos resultados
+    GEMINI_BATCH_MAX_REQUESTS: int = 50
+    GEMINI_BATCH_MAX_WAIT_SECONDS: float = 60.0
+    GEMINI_BATCH_POLL_SECONDS: float = 30.0
+    GEMINI_BATCH_RESULT_TTL_SECONDS: int = 86400
 
     # GitHub API
     GITHUB_TOKEN: str = ""
 
+    # Cache de análises (por commit)
+    ANALYZE_CACHE_TTL_SECONDS: int = 3600
+    ANALYZE_CACHE_MAX_ENTRIES: int = 128
+
+    # Cache de extrações de repositório (por commit)
+    EXTRACT_CACHE_TTL_SECONDS: int = 3600
+    EXTRACT_CACHE_MAX_ENTRIES: int = 64
+
+    # Cache dos metadados do GitHub (estrelas, branches, linguagens...)
+    GITHUB_METADATA_CACHE_TTL_SECONDS: int = 300
+    GITHUB_METADATA_CACHE_MAX_ENTRIES: int = 1024
+
+    # Cache de recursos de aprendizado (por conjunto de tecnologias)
+    LEARNING_CACHE_TTL_SECONDS: int = 86400
+    LEARNING_CACHE_MAX_ENTRIES: int = 512
+
+    # Contextos a partir deste tamanho (chars) têm o prompt montado em uma
+    # thread, fora do event loop
+    CPU_OFFLOAD_MIN_CHARS: int = 20000
+
+    # Processos para descompactar/analisar ZIPs de repositórios (0 = threads)
+    CPU_PROCESS_WORKERS: int = 2
+
     # ElevenLabs API (for podcast generation)
     ELEVENLABS_API_KEY: str = ""
 
+    # Status dos podcasts gerados em segundo plano: Redis se configurado
+    # (compartilhado entre workers), senão em memória
+    REDIS_URL: str = ""
+    PODCAST_STATUS_TTL_SECONDS: int = 86400
+    PODCAST_STATUS_MAX_ENTRIES: int = 10000
+    # Fila dos podcasts em segundo plano (Redis Stream, consumida pelo
+    # podcast_worker.py): tamanho máximo do stream, jobs simultâneos por
+    # worker e espera de cada leitura
+    PODCAST_QUEUE_MAX_LEN: int = 10000
+    PODCAST_WORKER_CONCURRENCY: int = 2
+    PODCAST_WORKER_BLOCK_MS: int = 5000
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+
     # App
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Nexo API"
+    # Schema OpenAPI (e /docs); vazio desativa, ex.: em produção
+    OPENAPI_URL: str = "/openapi.json"
 
     # CORS - Segurança
     ALLOWED_ORIGINS: list = [
@@ -49,4 +120,10 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Configurações carregadas uma única vez (o .env só é lido na 1ª chamada)."""
+    return Settings()
+
+
+settings = get_settings()
@@ -0,0 +1,25 @@
+"""
+Amostragem de tracebacks nos logs.
+
+Formatar a pilha de uma exceção é caro. Em uma rajada de erros iguais,
+só o primeiro de cada janela sai com traceback; os demais registram
+apenas a mensagem.
+"""
+
+import time
+
+# Intervalo mínimo entre dois tracebacks da mesma chave
+TRACE_WINDOW_SECONDS = 60.0
+
+# Último traceback registrado por chave (ex.: "learning:KeyError")
+_last_trace: dict[str, float] = {}
+
+
+def should_log_trace(key: str, window: float = TRACE_WINDOW_SECONDS) -> bool:
+    """Indica se o traceback de `key` deve ser registrado agora."""
+    now = time.monotonic()
+    last = _last_trace.get(key)
+    if last is not None and now - last < window:
+        return False
+    _last_trace[key] = now
+    return True
@@ -0,0 +1,40 @@
+"""
+Validação e parsing de URLs de repositórios do GitHub.
+
+A expressão é compilada uma única vez e não tem quantificadores aninhados:
+o tempo de verificação é linear no tamanho da URL, mesmo para entradas
+montadas para forçar backtracking.
+"""
+
+import re
+
+# https://github.com/owner/repo, com "www.", ".git" e caminho final opcionais
+# (ex.: .../tree/main, colado direto do navegador). Usar com `fullmatch`.
+GITHUB_REPO_URL = re.compile(
+    r"https?://(?:www\.)?github\.com/([A-Za-z0-9-]+)/([A-Za-z0-9._-]+?)"
+    r"(?:\.git)?(?:/.*)?"
+)
+
+INVALID_GITHUB_URL = (
+    "URL do GitHub inválida. Use o formato: https://github.com/owner/repo"
+)
+
+
+def parse_github_url(github_url: str) -> tuple[str, str]:
+    """
+    Extrai owner e nome do repositório de uma URL do GitHub.
+    Ex: https://github.com/owner/repo.git -> (owner, repo)
+
+    Raises:
+        ValueError: se a URL não for de um repositório do GitHub
+    """
+    match = GITHUB_REPO_URL.fullmatch(github_url.strip())
+    if match is None:
+        raise ValueError(INVALID_GITHUB_URL)
+    return match.group(1), match.group(2)
+
+
+def normalize_github_url(github_url: str) -> str:
+    """Forma canônica da URL (https://github.com/owner/repo)."""
+    owner, repo = parse_github_url(github_url)
+    return f"https://github.com/{owner}/{repo}"
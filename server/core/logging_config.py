@@ -0,0 +1,76 @@
+"""
+Configuração de logging da aplicação.
+
+Os handlers de saída rodam em uma thread separada (QueueHandler +
+QueueListener): no event loop, registrar um log é apenas colocar o
+registro em uma fila, sem escrita em stdout/stderr.
+"""
+
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+from core.config import settings
+
+
+# Atributos padrão de um LogRecord - o que sobrar veio de `extra={...}`
+_RECORD_ATTRS = set(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Formatter que acrescenta os campos de `extra` como `chave=valor`."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        fields = " ".join(
+            f"{key}={value!r}"
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS
+        )
+        return f"{text} {fields}" if fields else text
+
+
+def setup_logging() -> None:
+    """Configura o logger raiz com uma fila e inicia a thread de escrita."""
+    global _listener, _queue_handler
+
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    )
+
+    # A mensagem (com os campos extras e o traceback) é montada ao enfileirar
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.setFormatter(KeyValueFormatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e encerra a thread de escrita."""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,44 @@
+"""
+Compressão local do contexto enviado à IA.
+
+Remove do conteúdo dos arquivos o que gasta tokens sem informar nada ao
+modelo: comentários HTML, linhas só de badges/imagens, espaços no fim das
+linhas e sequências de linhas em branco. Blocos de código (```) ficam
+intactos, assim como caminhos, nomes e números do texto.
+"""
+
+import re
+
+# Blocos de código cercados por ``` (preservados)
+_CODE_FENCE = re.compile(r"(```.*?```)", re.S)
+
+# Comentários HTML (comuns em READMEs: instruções de template, TOCs gerados)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+
+# Linhas formadas apenas por imagens/badges em Markdown, com ou sem link
+_BADGE = r"(?:\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)|!\[[^\]]*\]\([^)]*\))"
+_BADGE_LINE = re.compile(rf"^[ \t]*{_BADGE}(?:[ \t]*{_BADGE})*[ \t]*$", re.M)
+
+_TRAILING_SPACES = re.compile(r"[ \t]+$", re.M)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _compress_prose(text: str) -> str:
+    """Comprime um trecho fora de blocos de código."""
+    text = _HTML_COMMENT.sub("", text)
+    text = _BADGE_LINE.sub("", text)
+    text = _TRAILING_SPACES.sub("", text)
+    return _BLANK_LINES.sub("\n\n", text)
+
+
+def compress_context(text: str) -> str:
+    """
+    Comprime o conteúdo de um arquivo para o contexto da IA.
+
+    Os trechos em posições ímpares do split são blocos de código e são
+    mantidos como estão.
+    """
+    parts = _CODE_FENCE.split(text)
+    for i in range(0, len(parts), 2):
+        parts[i] = _compress_prose(parts[i])
+    return "".join(parts)
@@ -0,0 +1,44 @@
+"""
+Templates de prompt pré-compilados.
+"""
+
+from string import Formatter
+from typing import Optional
+
+
+class PromptTemplate:
+    """
+    Template no formato de `str.format`, analisado uma única vez.
+
+    Na criação o texto é quebrado em trechos literais e nomes de campos;
+    `render` apenas intercala os valores, sem reprocessar o template
+    a cada requisição.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self._parts: list[tuple[str, Optional[str]]] = []
+
+        for literal, field_name, format_spec, conversion in Formatter().parse(
+            template
+        ):
+            if format_spec or conversion:
+                raise ValueError(
+                    f"Campo '{field_name}' usa format spec/conversão, não suportado"
+                )
+            self._parts.append((literal, field_name))
+
+        self.fields = tuple(name for _, name in self._parts if name is not None)
+
+        # Texto fixo (sem os campos variáveis) e seu tamanho
+        self.static_text = "".join(literal for literal, _ in self._parts)
+        self.static_chars = len(self.static_text)
+
+    def render(self, **values) -> str:
+        """Preenche o template com os valores informados."""
+        chunks = []
+        for literal, field_name in self._parts:
+            chunks.append(literal)
+            if field_name is not None:
+                chunks.append(str(values[field_name]))
+        return "".join(chunks)
@@ -1,40 +1,83 @@
 """
 Utilitários de segurança e autenticação
 """
+import asyncio
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
+from argon2 import PasswordHasher
 from jose import jwt, JWTError
 
 from core.config import settings
+from services.cache import TTLCache
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Payloads de tokens já validados, pelo hash do token (tamanho fixo)
+_token_cache = TTLCache(
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+)
+
+# Hasher das senhas novas: argon2id (memory-hard), com custos configuráveis
+password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# Prefixo dos hashes bcrypt (gerados antes do argon2id)
+BCRYPT_PREFIX = "$2"
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifica se a senha corresponde ao hash.
-    Usa bcrypt com timing attack protection.
+    Verifica se a senha corresponde ao hash (argon2id ou bcrypt legado).
+    Ambos comparam em tempo constante.
+
+    O hash leva centenas de ms de CPU e libera o GIL: roda em uma thread,
+    sem travar o event loop, e vários logins usam núcleos diferentes.
     """
+    return await asyncio.to_thread(_check_password, plain_password, hashed_password)
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            hashed_password.encode('utf-8')
-        )
+        if hashed_password.startswith(BCRYPT_PREFIX):
+            return bcrypt.checkpw(
+                plain_password.encode('utf-8'),
+                hashed_password.encode('utf-8')
+            )
+        return password_hasher.verify(hashed_password, plain_password)
     except Exception:
-        # Retorna False em caso de erro para evitar leakage de informação
+        # Senha errada ou hash inválido: retorna False para evitar leakage
+        # de informação
         return False
 
 
-def get_password_hash(password: str) -> str:
+def password_needs_rehash(hashed_password: str) -> bool:
     """
-    Gera hash seguro da senha usando bcrypt.
-    - Bcrypt é resistente a rainbow tables
+    Indica se o hash deve ser refeito: bcrypt legado ou argon2id com custos
+    diferentes dos atuais. Feito no login, com a senha em mãos.
+    """
+    if hashed_password.startswith(BCRYPT_PREFIX):
+        return True
+    try:
+        return password_hasher.check_needs_rehash(hashed_password)
+    except Exception:
+        return True
+
+
+async def get_password_hash(password: str) -> str:
+    """
+    Gera hash seguro da senha usando argon2id (em uma thread, como
+    `verify_password`).
+    - Resistente a rainbow tables e a ataques com GPU (memory-hard)
     - Salt gerado automaticamente
-    - Custo de 12 rounds (balance entre segurança e performance)
     """
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return await asyncio.to_thread(password_hasher.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -58,13 +101,29 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decodifica e valida token JWT."""
+    """
+    Decodifica e valida token JWT.
+
+    O mesmo token chega em várias requisições seguidas: o payload validado
+    fica em cache até o `exp` do token, e as próximas chamadas pulam a
+    verificação da assinatura. Tokens inválidos não são guardados.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token, 
             settings.SECRET_KEY, 
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+
+    # jwt.decode já recusa tokens expirados; sem `exp`, nada é guardado
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.set(key, payload, ttl_seconds=remaining)
+    return dict(payload)
@@ -0,0 +1,58 @@
+"""
+Contagem e corte de textos por tokens.
+
+Usa o tokenizer `cl100k_base` do tiktoken, carregado uma única vez.
+Se o tiktoken não estiver disponível (pacote ausente ou sem acesso ao
+arquivo do vocabulário), cai na estimativa de ~4 caracteres por token.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional
+
+log = logging.getLogger("nexo.tokens")
+
+# Estimativa usada quando o tokenizer não está disponível
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Carrega o tokenizer (uma vez por processo). Retorna None se indisponível."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        log.warning("tokenizer_unavailable", extra={"err": str(e)})
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Conta os tokens de um texto."""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fit_to_tokens(text: str, max_tokens: Optional[int]) -> tuple[str, int, bool]:
+    """
+    Limita um texto a `max_tokens` tokens, codificando-o uma única vez.
+
+    Returns:
+        (texto, total de tokens do texto original, se foi truncado)
+    """
+    encoding = get_encoding()
+
+    if encoding is None:
+        total = len(text) // CHARS_PER_TOKEN
+        if max_tokens is None or total <= max_tokens:
+            return text, total, False
+        return text[: max(max_tokens, 0) * CHARS_PER_TOKEN], total, True
+
+    tokens = encoding.encode(text, disallowed_special=())
+    total = len(tokens)
+    if max_tokens is None or total <= max_tokens:
+        return text, total, False
+    return encoding.decode(tokens[: max(max_tokens, 0)]), total, True
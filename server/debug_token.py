@@ -1,7 +1,13 @@
 """
 Script de Debug - Teste seu token aqui
 """
-import requests
+import base64
+import json
+from datetime import datetime
+
+import httpx
+
+API_URL = "http://127.0.0.1:8000"
 
 print("\n" + "="*70)
 print("🔍 DEBUG - TESTE SEU TOKEN DO INSOMNIA")
@@ -22,9 +28,12 @@ if TOKEN.strip() != TOKEN:
 
 print("\n🧪 Testando token na API...")
 
+# Um único cliente: o segundo teste reaproveita a conexão do primeiro
+client = httpx.Client(base_url=API_URL)
+
 # Teste 1: Com Bearer
 headers1 = {"Authorization": f"Bearer {TOKEN}"}
-response1 = requests.get("http://127.0.0.1:8000/api/v1/auth/me", headers=headers1)
+response1 = client.get("/api/v1/auth/me", headers=headers1)
 
 print(f"\n1️⃣ Teste com 'Bearer {TOKEN[:20]}...'")
 print(f"   Status: {response1.status_code}")
@@ -35,7 +44,8 @@ else:
 
 # Teste 2: Sem Bearer (para comparar)
 headers2 = {"Authorization": TOKEN}
-response2 = requests.get("http://127.0.0.1:8000/api/v1/auth/me", headers=headers2)
+response2 = client.get("/api/v1/auth/me", headers=headers2)
+client.close()
 
 print(f"\n2️⃣ Teste SEM 'Bearer' (só token)")
 print(f"   Status: {response2.status_code}")
@@ -54,8 +64,6 @@ if len(parts) == 3:
     
     # Decodificar payload
     try:
-        import base64
-        import json
         # Adicionar padding se necessário
         payload = parts[1] + '=' * (4 - len(parts[1]) % 4)
         decoded = base64.urlsafe_b64decode(payload)
@@ -63,7 +71,6 @@ if len(parts) == 3:
         print(f"\n   📦 Payload decodificado:")
         print(f"      Email: {payload_data.get('sub')}")
         
-        from datetime import datetime
         exp_timestamp = payload_data.get('exp')
         if exp_timestamp:
             exp_date = datetime.fromtimestamp(exp_timestamp)
@@ -2,46 +2,68 @@
 Nexo API - FastAPI Application
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import auth, extract, podcast, overview, analyze, saved_repos, learning
 from core.config import settings
+from core.logging_config import setup_logging, shutdown_logging
+from core.tokens import get_encoding
 from services.database import connect_to_mongo, close_mongo_connection
+from services.extract import ExtractError
+from services.http_client import start_http_client, close_http_client
+from services.process_pool import start_process_pool, close_process_pool
+from services.redis_client import connect_to_redis, close_redis_connection
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação."""
     # Startup
+    setup_logging()
     await connect_to_mongo()
+    await start_http_client()
+    await start_process_pool()
+    await connect_to_redis()
+    # Carrega o tokenizer fora do event loop (pode baixar o vocabulário)
+    await asyncio.to_thread(get_encoding)
     yield
     # Shutdown
+    await close_redis_connection()
+    await close_process_pool()
+    await close_http_client()
     await close_mongo_connection()
+    shutdown_logging()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Backend API for Nexo application with authentication",
     version="0.1.0",
+    openapi_url=settings.OPENAPI_URL or None,
     lifespan=lifespan,
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",
-        "http://localhost:5174",
-        "http://localhost:3000",
-        "http://localhost:8000",
-        "http://127.0.0.1:5173",
-        "http://127.0.0.1:5174",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:8000",
-    ],
+    # frozenset: a origem de cada requisição é buscada nele
+    allow_origins=frozenset(
+        {
+            "http://localhost:5173",
+            "http://localhost:5174",
+            "http://localhost:3000",
+            "http://localhost:8000",
+            "http://127.0.0.1:5173",
+            "http://127.0.0.1:5174",
+            "http://127.0.0.1:3000",
+            "http://127.0.0.1:8000",
+        }
+    ),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -58,9 +80,26 @@ app.include_router(analyze.router, prefix=settings.API_V1_PREFIX)
 app.include_router(saved_repos.router, prefix=settings.API_V1_PREFIX)
 app.include_router(learning.router, prefix=settings.API_V1_PREFIX)
 
+# Endpoints que respondem falhas na extração no próprio formato (status 200,
+# como as falhas da IA); nos demais, vale o tratamento padrão de HTTPException
+EXTRACT_ERROR_RESPONSES = {
+    overview.generate_overview: overview.extract_error_response,
+}
 
+
+@app.exception_handler(ExtractError)
+async def extract_error_handler(request: Request, exc: ExtractError):
+    """Converte falhas na extração na resposta de erro do endpoint."""
+    build = EXTRACT_ERROR_RESPONSES.get(request.scope.get("endpoint"))
+    if build is None:
+        return await http_exception_handler(request, exc)
+    return Response(build(exc).model_dump_json(), media_type="application/json")
+
+
+# Rotas com tipo de retorno: a resposta é serializada direto para JSON pelo
+# Pydantic (núcleo em Rust), como nas rotas com response_model
 @app.get("/")
-async def root():
+async def root() -> dict[str, str]:
     """Root endpoint."""
     return {
         "message": "Welcome to Nexo API",
@@ -70,6 +109,25 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy", "database": "connected"}
+
+
+if __name__ == "__main__":
+    import os
+
+    import uvicorn
+
+    # uvloop/httptools vêm com uvicorn[standard]. Sem REDIS_URL, status dos
+    # podcasts e caches ficam em memória por processo: mais de um worker
+    # (WEB_CONCURRENCY) só com Redis configurado
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        backlog=2048,
+    )
@@ -1,7 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional
 
+from core.github_url import normalize_github_url
+
+
 class RepoRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     github_url: str
     branch: Optional[str] = None  # Se None, usa a branch padrão do repositório
-    token: Optional[str] = None  # Token opcional para repos privados
\ No newline at end of file
+    token: Optional[str] = None  # Token opcional para repos privados
+
+    @field_validator("github_url")
+    @classmethod
+    def validate_github_url(cls, value: str) -> str:
+        """Aceita apenas URLs de repositório do GitHub, na forma canônica."""
+        return normalize_github_url(value)
@@ -2,7 +2,7 @@
 Modelo de repositório salvo para MongoDB
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 
 
@@ -26,8 +26,15 @@ class SavedRepoModel:
         file_analysis: Optional[Dict[str, Any]] = None,
         dependencies: Optional[List[Dict[str, Any]]] = None,
         created_at: Optional[datetime] = None,
+        updated_at: Optional[datetime] = None,
     ) -> dict:
-        """Converte para dicionário do MongoDB."""
+        """
+        Converte para dicionário do MongoDB.
+
+        Datas não informadas usam o horário atual (UTC); em escritas em lote, o
+        chamador pode calcular `now` uma vez e passá-lo a todos os documentos.
+        """
+        now = datetime.now(timezone.utc)
         return {
             "user_id": user_id,
             "repo_url": repo_url,
@@ -43,8 +50,8 @@ class SavedRepoModel:
             "repository_info": repository_info,
             "file_analysis": file_analysis,
             "dependencies": dependencies or [],
-            "created_at": created_at or datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "created_at": created_at or now,
+            "updated_at": updated_at or now,
         }
 
     @staticmethod
@@ -1,7 +1,7 @@
 """
 Modelo de usuário para MongoDB
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
 
@@ -22,7 +22,7 @@ class UserModel:
             "name": name,
             "hashed_password": hashed_password,
             "is_active": is_active,
-            "created_at": created_at or datetime.utcnow(),
+            "created_at": created_at or datetime.now(timezone.utc),
         }
     
     @staticmethod
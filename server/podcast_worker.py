@@ -0,0 +1,37 @@
+"""
+Worker dos podcasts em segundo plano (requer REDIS_URL).
+
+Consome a fila `podcast:jobs` (Redis Stream) e gera os áudios fora dos
+workers da API:
+
+    python podcast_worker.py
+"""
+
+import asyncio
+import os
+import socket
+
+from api import podcast  # noqa: F401 - registra os handlers na fila
+from core.logging_config import setup_logging, shutdown_logging
+from services.http_client import start_http_client, close_http_client
+from services.podcast_queue import podcast_queue
+from services.redis_client import connect_to_redis, close_redis_connection
+
+
+async def main():
+    """Conecta ao Redis e processa os jobs até ser interrompido."""
+    setup_logging()
+    await connect_to_redis()
+    await start_http_client()
+    try:
+        # Nome estável por host: após reiniciar, retoma os próprios jobs pendentes
+        consumer = os.getenv("PODCAST_WORKER_NAME", socket.gethostname())
+        await podcast_queue.consume(consumer)
+    finally:
+        await close_http_client()
+        await close_redis_connection()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
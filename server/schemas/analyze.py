@@ -3,15 +3,17 @@ Schemas para o endpoint unificado de Análise.
 Combina extração de dados + geração de overview em uma única resposta.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict
 
+from models.basic import RepoRequest
 from schemas.extract import (
     RepositoryInfoSchema,
     FileAnalysisSchema,
     DependencySchema,
     ContextSchema,
 )
+from schemas.learning import LearningResourcesResponse
 from schemas.overview import OverviewUsageSchema
 
 
@@ -58,8 +60,8 @@ class AnalyzeResponseSchema(BaseModel):
         None, description="Erro específico na geração do overview (se houver)"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "repository": {
@@ -131,3 +133,40 @@ class AnalyzeResponseSchema(BaseModel):
                 "overview_error": None,
             }
         }
+    )
+
+
+class AnalyzeBatchRequestSchema(BaseModel):
+    """Requisição de análise de vários repositórios em uma única chamada."""
+
+    items: List[RepoRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Repositórios a analisar (mesmo formato de /analyze/full)",
+    )
+    max_concurrency: int = Field(
+        5, ge=1, le=10, description="Máximo de análises executadas ao mesmo tempo"
+    )
+
+
+class AnalyzeBatchResponseSchema(BaseModel):
+    """Resposta da análise em lote, na mesma ordem dos itens da requisição."""
+
+    results: List[AnalyzeResponseSchema] = Field(
+        ..., description="Resultado de cada análise"
+    )
+
+
+class AnalyzeAllResponseSchema(BaseModel):
+    """Análise completa e recursos de aprendizado a partir de uma única extração."""
+
+    analysis: AnalyzeResponseSchema = Field(
+        ..., description="Mesmo resultado de /analyze/full"
+    )
+    learning: Optional[LearningResourcesResponse] = Field(
+        None, description="Recursos de aprendizado das tecnologias detectadas"
+    )
+    learning_error: Optional[str] = Field(
+        None, description="Erro na geração dos recursos de aprendizado (se houver)"
+    )
@@ -3,7 +3,7 @@ Schemas para extração de repositórios.
 Define os modelos de resposta da API de extração.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict
 
 
@@ -64,6 +64,19 @@ class RepositoryInfoSchema(BaseModel):
         default_factory=dict, description="Linguagens (bytes por linguagem)"
     )
 
+    @classmethod
+    def from_github(cls, github_data: dict) -> "RepositoryInfoSchema":
+        """Monta as informações do repositório a partir dos metadados do GitHub."""
+        return cls(
+            info=github_data.get("metadata") or None,
+            contributors=github_data.get("contributors", []),
+            branches=BranchesInfoSchema(
+                count=github_data.get("branch_count", 0),
+                list=github_data.get("branches", []),
+            ),
+            languages=github_data.get("languages", {}),
+        )
+
 
 # === Schemas de Análise de Arquivos ===
 class CategoryStatsSchema(BaseModel):
@@ -103,6 +116,21 @@ class FileAnalysisSchema(BaseModel):
         default_factory=dict, description="Top extensões"
     )
 
+    @classmethod
+    def from_file_stats(cls, file_stats: dict) -> "FileAnalysisSchema":
+        """Monta a análise de arquivos a partir das estatísticas da extração."""
+        return cls(
+            summary=FileSummarySchema(
+                total_files=file_stats.get("total_files", 0),
+                total_lines=file_stats.get("total_lines", 0),
+                total_size=file_stats.get("total_size_human", "0 B"),
+                files_in_context=file_stats.get("files_in_context", 0),
+                total_analyzed=file_stats.get("total_files_analyzed", 0),
+            ),
+            by_category=file_stats.get("by_category", {}),
+            top_extensions=file_stats.get("by_extension", {}),
+        )
+
 
 # === Schemas de Dependências ===
 class DependencySchema(BaseModel):
@@ -125,7 +153,7 @@ class ContextSchema(BaseModel):
 
     payload: str = Field(..., description="Conteúdo formatado dos arquivos")
     total_chars: int = Field(..., description="Total de caracteres")
-    estimated_tokens: int = Field(..., description="Estimativa de tokens (chars/4)")
+    estimated_tokens: int = Field(..., description="Tokens do payload (tokenizer cl100k)")
     max_chars: int = Field(..., description="Limite máximo de caracteres configurado")
     files_in_context: int = Field(
         ..., description="Número de arquivos incluídos no payload"
@@ -157,8 +185,8 @@ class ExtractResponseSchema(BaseModel):
     context: ContextSchema = Field(..., description="Contexto para IA")
     errors: Optional[List[str]] = Field(None, description="Erros durante processamento")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "repository": {
@@ -234,3 +262,4 @@ class ExtractResponseSchema(BaseModel):
                 "errors": None,
             }
         }
+    )
@@ -3,7 +3,7 @@ Schemas para recursos de aprendizado baseados em tecnologias detectadas.
 """
 
 from typing import List, Literal
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field
 
 
 class LearningResource(BaseModel):
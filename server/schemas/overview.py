@@ -3,9 +3,11 @@ Schemas para o endpoint de Overview.
 Define os modelos de resposta para geração de resumos com IA.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict
 
+from models.basic import RepoRequest
+
 
 class OverviewUsageSchema(BaseModel):
     """Estatísticas de uso da API do Gemini."""
@@ -13,6 +15,7 @@ class OverviewUsageSchema(BaseModel):
     prompt_tokens: int = Field(0, description="Tokens do prompt enviado")
     completion_tokens: int = Field(0, description="Tokens da resposta gerada")
     total_tokens: int = Field(0, description="Total de tokens consumidos")
+    model: Optional[str] = Field(None, description="Modelo que gerou a resposta")
 
 
 class OverviewResponseSchema(BaseModel):
@@ -31,8 +34,8 @@ class OverviewResponseSchema(BaseModel):
         None, description="Estatísticas do contexto usado"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "repository_name": "user/example-repo",
@@ -50,3 +53,36 @@ class OverviewResponseSchema(BaseModel):
                 },
             }
         }
+    )
+
+
+class OverviewBatchRequestSchema(BaseModel):
+    """Requisição de overview de vários repositórios em uma única chamada."""
+
+    items: List[RepoRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="Repositórios (mesmo formato de /overview/generate)",
+    )
+    max_concurrency: int = Field(
+        5, ge=1, le=10, description="Máximo de overviews gerados ao mesmo tempo"
+    )
+
+
+class OverviewBatchResponseSchema(BaseModel):
+    """Resposta do overview em lote, na mesma ordem dos itens da requisição."""
+
+    results: List[OverviewResponseSchema] = Field(
+        ..., description="Resultado de cada overview"
+    )
+
+
+class OverviewJobSchema(BaseModel):
+    """Overview gerado em segundo plano (Batch API do Gemini)."""
+
+    job_id: str = Field(..., description="ID para consultar o resultado")
+    status: str = Field(..., description="Status do job (pending/done)")
+    result: Optional[OverviewResponseSchema] = Field(
+        None, description="Overview gerado (quando status = done)"
+    )
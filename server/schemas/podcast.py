@@ -2,12 +2,14 @@
 Pydantic schemas for Podcast generation endpoints
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List
 
 
 class RepositoryAnalysis(BaseModel):
     """Schema for repository analysis data"""
+    model_config = ConfigDict(extra="ignore")
+
     name: str = Field(..., description="Repository name")
     description: Optional[str] = Field(None, description="Repository description")
     primary_language: Optional[str] = Field(None, description="Main programming language")
@@ -17,7 +19,7 @@ class RepositoryAnalysis(BaseModel):
     key_features: List[str] = Field(default_factory=list, description="Key features")
     file_structure: Optional[str] = Field(None, description="File structure overview")
     dependencies: List[str] = Field(default_factory=list, description="Project dependencies")
-    additional_info: Optional[Dict[str, Any]] = Field(None, description="Any additional information")
+    additional_info: Optional[dict] = Field(None, description="Any additional information")
 
 
 class GeneralPodcastRequest(BaseModel):
@@ -58,6 +60,13 @@ class PodcastResponse(BaseModel):
     script: Optional[str] = Field(None, description="The script used for generation")
 
 
+class PodcastJobResponse(BaseModel):
+    """Schema for a podcast generation started in the background"""
+    podcast_id: str = Field(..., description="Unique podcast identifier")
+    status: str = Field(..., description="Initial status (pending)")
+    status_url: str = Field(..., description="URL to check the generation status")
+
+
 class PodcastStatus(BaseModel):
     """Schema for checking podcast generation status"""
     podcast_id: str = Field(..., description="Unique podcast identifier")
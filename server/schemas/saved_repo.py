@@ -5,12 +5,16 @@ Schemas de validação para repositórios salvos
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SaveRepoRequest(BaseModel):
     """Schema para salvar um repositório."""
 
+    # Campos extras do cliente são descartados. Os blocos da análise são
+    # guardados como vieram: `dict` puro, sem tipar chaves e valores
+    model_config = ConfigDict(extra="ignore")
+
     repo_url: str = Field(..., description="URL do repositório GitHub")
     repo_name: str = Field(..., description="Nome do repositório")
     repo_full_name: str = Field(..., description="Nome completo (owner/repo)")
@@ -21,15 +25,11 @@ class SaveRepoRequest(BaseModel):
     overview: Optional[str] = Field(None, description="Overview gerado pela IA")
     podcast_url: Optional[str] = Field(None, description="URL do podcast gerado")
     podcast_script: Optional[str] = Field(None, description="Script do podcast")
-    repository_info: Optional[Dict[str, Any]] = Field(
+    repository_info: Optional[dict] = Field(
         None, description="Informações do repositório"
     )
-    file_analysis: Optional[Dict[str, Any]] = Field(
-        None, description="Análise de arquivos"
-    )
-    dependencies: Optional[List[Dict[str, Any]]] = Field(
-        None, description="Dependências"
-    )
+    file_analysis: Optional[dict] = Field(None, description="Análise de arquivos")
+    dependencies: Optional[list[dict]] = Field(None, description="Dependências")
 
 
 class SavedRepoResponse(BaseModel):
@@ -53,8 +53,7 @@ class SavedRepoResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class SavedRepoListResponse(BaseModel):
@@ -79,8 +78,7 @@ class SavedRepoSummary(BaseModel):
     has_podcast: bool = False
     created_at: datetime
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class SavedRepoListSummaryResponse(BaseModel):
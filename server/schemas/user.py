@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Optional
 import re
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 class UserBase(BaseModel):
@@ -55,8 +55,7 @@ class UserResponse(UserBase):
     created_at: datetime
     is_active: bool = True
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class Token(BaseModel):
@@ -1,6 +1,8 @@
 """
 Serviço de autenticação
 """
+import hashlib
+import hmac
 from datetime import timedelta
 from typing import Optional
 
@@ -11,16 +13,56 @@ from core.config import settings
 from core.security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
     decode_access_token,
 )
 from models.user import UserModel
 from schemas.user import UserCreate, UserLogin, Token, UserResponse
+from services.cache import TTLCache
 from services.database import get_database
+from services.redis_client import get_redis
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# Tentativas de login que falharam recentemente (Redis se configurado, senão
+# em memória). Repetir a mesma senha errada não roda o argon2id de novo
+# (~130ms de CPU e 64 MiB de memória com os ARGON2_* padrão); acertos nunca
+# são guardados.
+_failed_logins = TTLCache(
+    ttl_seconds=settings.LOGIN_FAILURE_CACHE_TTL_SECONDS,
+    max_entries=settings.LOGIN_FAILURE_CACHE_MAX_ENTRIES,
+)
+
+
+def _login_failure_key(hashed_password: str, password: str) -> str:
+    """
+    Chave da tentativa: HMAC com a SECRET_KEY, então não serve para testar
+    senhas fora do servidor. O hash armazenado entra na chave, logo uma troca
+    de senha invalida as falhas anteriores.
+    """
+    message = f"{hashed_password}:{password}".encode("utf-8")
+    digest = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256)
+    return f"loginneg:{digest.hexdigest()}"
+
+
+async def _is_known_failure(key: str) -> bool:
+    """Indica se a mesma tentativa falhou recentemente."""
+    client = get_redis()
+    if client is None:
+        return _failed_logins.get(key) is not None
+    return await client.exists(key) > 0
+
+
+async def _remember_failure(key: str):
+    """Guarda uma tentativa que falhou."""
+    client = get_redis()
+    if client is None:
+        _failed_logins.set(key, True)
+        return
+    await client.set(key, "1", ex=settings.LOGIN_FAILURE_CACHE_TTL_SECONDS)
+
 
 class AuthService:
     """Serviço de autenticação e gerenciamento de usuários."""
@@ -43,7 +85,7 @@ class AuthService:
         user_dict = UserModel.to_dict(
             email=user_data.email,
             name=user_data.name,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash(user_data.password),
         )
         
         result = await self.collection.insert_one(user_dict)
@@ -58,12 +100,25 @@ class AuthService:
         if not user:
             return None
         
-        if not verify_password(credentials.password, user["hashed_password"]):
+        failure_key = _login_failure_key(user["hashed_password"], credentials.password)
+        if await _is_known_failure(failure_key):
+            return None
+        
+        if not await verify_password(credentials.password, user["hashed_password"]):
+            await _remember_failure(failure_key)
             return None
         
         if not user.get("is_active", True):
             return None
         
+        # Migra hashes antigos (bcrypt) para o argon2id no primeiro login
+        if password_needs_rehash(user["hashed_password"]):
+            user["hashed_password"] = await get_password_hash(credentials.password)
+            await self.collection.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"hashed_password": user["hashed_password"]}},
+            )
+        
         return UserModel.from_dict(user)
     
     async def login(self, credentials: UserLogin) -> Token:
@@ -0,0 +1,58 @@
+"""
+Cache em memória com expiração (TTL) e limite de entradas (LRU).
+Usado para evitar refazer extrações e chamadas ao Gemini para o mesmo conteúdo.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU com tempo de expiração por entrada.
+
+    Todas as operações são síncronas (sem `await`), portanto atômicas dentro
+    do event loop - não é necessário lock.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 128):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor armazenado ou `default` se ausente/expirado."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        # Marca como usado recentemente
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Armazena um valor, removendo as entradas menos usadas se necessário."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove uma entrada do cache."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Remove todas as entradas."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,6 +1,7 @@
 """
 Configuração e conexão com MongoDB
 """
+from datetime import timezone
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from typing import Optional
 
@@ -18,7 +19,17 @@ mongodb = MongoDB()
 
 async def connect_to_mongo():
     """Conecta ao MongoDB."""
-    mongodb.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    mongodb.client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        compressors=settings.MONGODB_COMPRESSORS,
+        retryWrites=True,
+        # Datas lidas em UTC com fuso, como as gravadas pela API: toda
+        # resposta serializa created_at/updated_at no mesmo formato
+        tz_aware=True,
+        tzinfo=timezone.utc,
+    )
     mongodb.db = mongodb.client[settings.MONGODB_DB_NAME]
     
     # Teste de conexão
@@ -29,6 +40,19 @@ async def connect_to_mongo():
         print(f"❌ Erro ao conectar ao MongoDB: {e}")
         raise
 
+    await ensure_indexes(mongodb.db)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """
+    Cria os índices usados pelas consultas da API (sem efeito se já existem).
+
+    saved_repos (user_id, created_at desc): a listagem paginada do usuário
+    e a contagem viram varreduras limitadas do índice, sem varrer a coleção
+    nem ordenar em memória.
+    """
+    await db.saved_repos.create_index([("user_id", 1), ("created_at", -1)])
+
 
 async def close_mongo_connection():
     """Fecha conexão com MongoDB."""
@@ -5,9 +5,15 @@ Supports two types of podcasts:
 2. Specific questions/topics within a repository
 """
 
-import httpx
+import os
+import uuid
 from typing import Optional, Dict, Any
 from core.config import settings
+from services.http_client import get_http_client
+
+
+# Size of the audio chunks written to disk while streaming
+AUDIO_CHUNK_SIZE = 64 * 1024
 
 
 class ElevenLabsService:
@@ -35,25 +41,14 @@ class ElevenLabsService:
             "xi-api-key": self.api_key
         }
     
-    async def generate_podcast(
+    def _tts_request(
         self,
         text: str,
-        voice_id: Optional[str] = None,
-        model_id: str = "eleven_turbo_v2",  # Free tier compatible model
-        voice_settings: Optional[Dict[str, Any]] = None
-    ) -> bytes:
-        """
-        Generate audio podcast from text using ElevenLabs
-        
-        Args:
-            text: The text to convert to speech
-            voice_id: Voice ID to use (defaults to Adam - widely available)
-            model_id: ElevenLabs model ID (eleven_turbo_v2 for free tier)
-            voice_settings: Custom voice settings
-            
-        Returns:
-            Audio data in bytes (MP3 format)
-        """
+        voice_id: Optional[str],
+        model_id: str,
+        voice_settings: Optional[Dict[str, Any]]
+    ) -> tuple[str, Dict[str, Any]]:
+        """Build the text-to-speech URL and request body"""
         # Use Adam voice by default as it's available to all free accounts
         voice_id = voice_id or self.ADAM_VOICE_ID
         
@@ -73,11 +68,69 @@ class ElevenLabsService:
             "model_id": model_id,
             "voice_settings": voice_settings
         }
+        return url, data
+    
+    async def generate_podcast(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        model_id: str = "eleven_turbo_v2",  # Free tier compatible model
+        voice_settings: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        """
+        Generate audio podcast from text using ElevenLabs
+        
+        Args:
+            text: The text to convert to speech
+            voice_id: Voice ID to use (defaults to Adam - widely available)
+            model_id: ElevenLabs model ID (eleven_turbo_v2 for free tier)
+            voice_settings: Custom voice settings
+            
+        Returns:
+            Audio data in bytes (MP3 format)
+        """
+        url, data = self._tts_request(text, voice_id, model_id, voice_settings)
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(url, json=data, headers=self.headers)
-            response.raise_for_status()
-            return response.content
+        client = get_http_client()
+        response = await client.post(
+            url, json=data, headers=self.headers, timeout=120.0
+        )
+        response.raise_for_status()
+        return response.content
+    
+    async def save_podcast(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        model_id: str = "eleven_turbo_v2",
+        voice_settings: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Generate audio podcast from text and write it to output_path
+        
+        The audio is streamed to disk as it arrives, so only one chunk is held
+        in memory. It goes to a temporary file that is renamed into place at
+        the end: a reader (e.g. an existence check for cached audio) never
+        sees a half-written file.
+        """
+        url, data = self._tts_request(text, voice_id, model_id, voice_settings)
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+        
+        client = get_http_client()
+        try:
+            async with client.stream(
+                "POST", url, json=data, headers=self.headers, timeout=120.0
+            ) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(AUDIO_CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
     
     def create_general_podcast_prompt(self, repo_analysis: Dict[str, Any]) -> str:
         """
@@ -201,34 +254,36 @@ Thanks for tuning in to this focused deep dive.
     async def generate_general_podcast(
         self,
         repo_analysis: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> bytes:
+        output_path: Optional[str] = None,
+        script: Optional[str] = None
+    ) -> Optional[bytes]:
         """
         Generate a complete general repository overview podcast
         
         Args:
             repo_analysis: Repository analysis data
             output_path: Optional path to save the audio file
+            script: Script already built by the caller (skips rebuilding it)
             
         Returns:
-            Audio data in bytes
+            Audio data in bytes (None when written to output_path)
         """
-        script = self.create_general_podcast_prompt(repo_analysis)
-        audio_data = await self.generate_podcast(script)
-        
+        if script is None:
+            script = self.create_general_podcast_prompt(repo_analysis)
         if output_path:
-            with open(output_path, "wb") as f:
-                f.write(audio_data)
+            await self.save_podcast(script, output_path)
+            return None
         
-        return audio_data
+        return await self.generate_podcast(script)
     
     async def generate_specific_podcast(
         self,
         question: str,
         context: str,
         analysis_response: str,
-        output_path: Optional[str] = None
-    ) -> bytes:
+        output_path: Optional[str] = None,
+        script: Optional[str] = None
+    ) -> Optional[bytes]:
         """
         Generate a podcast for specific topic/question
         
@@ -237,18 +292,20 @@ Thanks for tuning in to this focused deep dive.
             context: Repository context
             analysis_response: AI-generated answer
             output_path: Optional path to save the audio file
+            script: Script already built by the caller (skips rebuilding it)
             
         Returns:
-            Audio data in bytes
+            Audio data in bytes (None when written to output_path)
         """
-        script = self.create_specific_topic_prompt(question, context, analysis_response)
-        audio_data = await self.generate_podcast(script)
-        
+        if script is None:
+            script = self.create_specific_topic_prompt(
+                question, context, analysis_response
+            )
         if output_path:
-            with open(output_path, "wb") as f:
-                f.write(audio_data)
+            await self.save_podcast(script, output_path)
+            return None
         
-        return audio_data
+        return await self.generate_podcast(script)
 
 
 # Singleton instance
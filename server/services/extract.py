@@ -4,15 +4,34 @@ Orquestra o download, análise e extração de contexto do código.
 """
 
 import io
+import logging
 import zipfile
 import asyncio
 import httpx
 import fnmatch
 from fastapi import HTTPException
 from dataclasses import asdict
+from typing import Awaitable, Optional
 
+from core.config import settings
+from services.cache import TTLCache
 from services.github_api import GitHubAPIService
+from services.http_client import get_http_client
+from services.process_pool import run_cpu_bound
 from services.file_analyzer import FileAnalyzer, directory_to_dict
+from core.prompt_compress import compress_context
+
+
+log = logging.getLogger("nexo.extract")
+
+
+class ExtractError(HTTPException):
+    """
+    Falha ao baixar ou processar o repositório (status HTTP + mensagem).
+    `github_url` identifica o repositório para quem trata o erro.
+    """
+
+    github_url: Optional[str] = None
 
 
 # Configurações / Constantes
@@ -24,9 +43,25 @@ MAX_CONTEXT_CHARS = 48000
 # Limite máximo por arquivo individual (evita que um CHANGELOG.md gigante ocupe tudo)
 MAX_FILE_CHARS = 8000
 
+# Menor trecho útil de um arquivo cortado para caber no contexto; abaixo
+# disso, os arquivos menos prioritários saem do contexto
+MIN_SECTION_CHARS = 500
+
+CONTEXT_LIMIT_MARKER = "\n... [CONTEXT LIMIT REACHED]"
+
 # Limite máximo para a estrutura de diretórios (para repos gigantes como React)
 MAX_TREE_CHARS = 3000
 
+# Máximo de chamadas simultâneas à API do GitHub por extração
+GITHUB_API_CONCURRENCY = 5
+
+# Metadados do GitHub por (url, token): mudam pouco, e cada busca custa
+# quatro chamadas à API (e cota do rate limit)
+_metadata_cache = TTLCache(
+    ttl_seconds=settings.GITHUB_METADATA_CACHE_TTL_SECONDS,
+    max_entries=settings.GITHUB_METADATA_CACHE_MAX_ENTRIES,
+)
+
 # === CONSTANTES DE PRIORIZAÇÃO ===
 
 # TIER 1: Arquivos que explicam O QUE o projeto faz (Documentação)
@@ -188,38 +223,83 @@ def get_file_priority(filepath: str) -> int:
     return 2
 
 
-def generate_tree_text(structure: dict, indent: str = "") -> str:
-    """Gera uma representação textual da árvore de diretórios para a IA."""
-    tree_str = ""
-    keys = sorted(structure.keys())
+def _section_threshold(lengths: list[int], budget: int) -> int:
+    """
+    Maior limite T tal que sum(min(tamanho, T)) <= budget, calculado com uma
+    única ordenação: os trechos menores que a parte justa entram inteiros e
+    o que sobra é dividido entre os maiores.
+    """
+    remaining = max(budget, 0)
+    ordered = sorted(lengths)
+    for i, length in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if length > share:
+            return share
+        remaining -= length
+    return ordered[-1] if ordered else 0
+
+
+def generate_tree_text(structure: dict, max_chars: Optional[int] = None) -> str:
+    """
+    Gera uma representação textual da árvore de diretórios para a IA.
+
+    As linhas são acumuladas em uma lista e unidas uma única vez. Com
+    `max_chars`, o percurso para assim que o texto passa do limite: em
+    repositórios gigantes a árvore não é montada inteira só para ser cortada.
+    """
+    lines = []
+    total_chars = 0
+
+    def walk(node: dict, indent: str) -> bool:
+        """Adiciona as linhas de `node`. Retorna True quando o limite é atingido."""
+        nonlocal total_chars
+        keys = sorted(node)
+
+        for i, key in enumerate(keys):
+            is_last = i == len(keys) - 1
+            prefix = "└── " if is_last else "├── "
 
-    for i, key in enumerate(keys):
-        is_last = i == len(keys) - 1
-        prefix = "└── " if is_last else "├── "
+            # Se for dict, é diretório
+            child = node[key]
+            is_dir = isinstance(child, dict)
+            line = f"{indent}{prefix}{key}/\n" if is_dir else f"{indent}{prefix}{key}\n"
+            lines.append(line)
+            total_chars += len(line)
 
-        # Se for dict, é diretório
-        if isinstance(structure[key], dict):
-            tree_str += f"{indent}{prefix}{key}/\n"
-            new_indent = indent + ("    " if is_last else "│   ")
-            tree_str += generate_tree_text(structure[key], new_indent)
-        else:
-            tree_str += f"{indent}{prefix}{key}\n"
+            if max_chars is not None and total_chars > max_chars:
+                return True
+            if is_dir and walk(child, indent + ("    " if is_last else "│   ")):
+                return True
 
-    return tree_str
+        return False
 
+    walk(structure, "")
+    return "".join(lines)
 
-async def _fetch_github_metadata(github_api: GitHubAPIService, github_url: str) -> dict:
+
+async def _fetch_github_metadata(
+    github_api: GitHubAPIService,
+    github_url: str,
+    concurrency: int = GITHUB_API_CONCURRENCY,
+) -> dict:
     """
     Busca metadados do GitHub em paralelo.
+    No máximo `concurrency` chamadas à API ficam em andamento ao mesmo tempo.
     Retorna um dicionário com todas as informações obtidas.
     """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
     try:
         # Executa todas as chamadas em paralelo
         results = await asyncio.gather(
-            github_api.get_repo_metadata(github_url),
-            github_api.get_contributors(github_url, limit=10),
-            github_api.get_branches(github_url),
-            github_api.get_languages(github_url),
+            limited(github_api.get_repo_metadata(github_url)),
+            limited(github_api.get_contributors(github_url, limit=10)),
+            limited(github_api.get_branches(github_url)),
+            limited(github_api.get_languages(github_url)),
             return_exceptions=True,  # Não falha se alguma chamada falhar
         )
 
@@ -254,90 +334,154 @@ async def _fetch_github_metadata(github_api: GitHubAPIService, github_url: str)
         }
 
 
-async def download_and_extract(github_url: str, branch: str = None, token: str = None) -> dict:
+async def fetch_metadata(
+    github_url: str, token: str = None, concurrency: int = GITHUB_API_CONCURRENCY
+) -> dict:
     """
-    Baixa o repositório, PRIORIZA arquivos descritivos e monta contexto limitado.
-    Retorna informações completas sobre o repositório com payload otimizado.
+    Busca apenas os metadados do GitHub (nome, estrelas, forks, etc.).
+    É bem mais rápido que o download do ZIP, permitindo que o chamador
+    comece a montar o prompt antes do payload ficar pronto.
     """
-    # Inicializa serviços
-    github_api = GitHubAPIService(token=token)
-    file_analyzer = FileAnalyzer(
-        ignored_dirs=IGNORED_DIRS, ignored_extensions=IGNORED_EXTENSIONS
-    )
+    key = (github_url.rstrip("/"), token)
+    github_data = _metadata_cache.get(key)
+    if github_data is None:
+        github_api = GitHubAPIService(token=token)
+        github_data = await _fetch_github_metadata(github_api, github_url, concurrency)
+        # Falhas (API fora, rate limit) não ficam em cache
+        if github_data["metadata"] is not None:
+            _metadata_cache.set(key, github_data)
 
-    # Se a branch não for especificada, busca a branch padrão do repositório
-    if not branch:
-        print("🔍 Branch não especificada, buscando branch padrão do repositório...")
-        metadata_preview = await _fetch_github_metadata(github_api, github_url)
-        branch = metadata_preview.get("metadata", {}).get("default_branch", "main")
-        print(f"📌 Usando branch padrão: {branch}")
+    # Cópia rasa: quem chama pode alterar o dict sem afetar o cache
+    return dict(github_data)
+
+
+async def _download_zip(zip_url: str, headers: dict) -> Optional[bytes]:
+    """
+    Baixa o ZIP de uma branch. Retorna None se ela não existir (404).
+    """
+    # Aumenta o timeout para repositórios grandes (120 segundos)
+    timeout = httpx.Timeout(120.0, connect=30.0)
+    client = get_http_client()
+
+    async with client.stream(
+        "GET", zip_url, headers=headers, follow_redirects=True, timeout=timeout
+    ) as response:
+        log.debug(
+            "zip_response", extra={"url": zip_url, "status": response.status_code}
+        )
+
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise ExtractError(
+                status_code=400, detail=f"Erro no GitHub: {response.status_code}"
+            )
 
-    # Monta a URL do ZIP
+        # Validação de Content-Length
+        content_length = response.headers.get("content-length")
+        if content_length and int(content_length) > MAX_REPO_SIZE_BYTES:
+            raise ExtractError(
+                status_code=413,
+                detail=f"Repositório muito grande ({int(content_length) / 1024 / 1024:.2f} MB). O limite é {MAX_REPO_SIZE_BYTES / 1024 / 1024} MB.",
+            )
+
+        # Se passou na verificação, lemos o conteúdo para a memória
+        return await response.aread()
+
+
+async def fetch_payload(
+    github_url: str,
+    branch: str = None,
+    token: str = None,
+    metadata_task: Optional[Awaitable[dict]] = None,
+) -> dict:
+    """
+    Baixa o repositório, PRIORIZA arquivos descritivos e monta contexto limitado.
+    Retorna estatísticas, dependências, estrutura e payload (sem os metadados do GitHub).
+
+    Se a branch não for informada, baixa a branch padrão via `archive/HEAD.zip`,
+    em paralelo com os metadados. Só se isso falhar espera `metadata_task`
+    (ou busca os metadados caso nenhuma task seja fornecida) para obter o nome.
+    """
     clean_url = github_url.rstrip("/")
-    
-    # Lista de branches para tentar (em ordem de prioridade)
-    branches_to_try = [branch, "main", "master", "develop", "dev"]
-    # Remove duplicatas mantendo a ordem
-    branches_to_try = list(dict.fromkeys(branches_to_try))
-    
+
     # Configura Headers (Autenticação se houver token)
     headers = {}
     if token:
         # GitHub aceita tanto "token" quanto "Bearer" para PATs
         headers["Authorization"] = f"token {token}"
-        print(f"🔑 Usando token do GitHub (primeiros 10 chars): {token[:10]}...")
     else:
-        print("⚠️ AVISO: Nenhum token GitHub fornecido - pode haver limite de rate")
-
-    # Busca metadados do GitHub em paralelo com o download
-    metadata_task = asyncio.create_task(_fetch_github_metadata(github_api, github_url))
+        log.debug("github_token_missing")
 
     file_bytes = None
-    successful_branch = None
-    
-    # Aumenta o timeout para repositórios grandes (120 segundos)
-    timeout = httpx.Timeout(120.0, connect=30.0)
-    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
+
+    # Sem branch, baixa o ZIP da branch padrão direto (archive/HEAD.zip),
+    # sem esperar os metadados para descobrir o nome dela
+    if not branch:
+        file_bytes = await _download_zip(f"{clean_url}/archive/HEAD.zip", headers)
+
+        # Se falhar, usa a branch padrão obtida dos metadados
+        if file_bytes is None:
+            if metadata_task is None:
+                metadata_task = fetch_metadata(github_url, token)
+            metadata_preview = await metadata_task
+            branch = (metadata_preview.get("metadata") or {}).get(
+                "default_branch", "main"
+            )
+            log.info("default_branch", extra={"branch": branch})
+
+    if file_bytes is None:
+        # Lista de branches para tentar (em ordem de prioridade)
+        branches_to_try = [branch, "main", "master", "develop", "dev"]
+        # Remove duplicatas mantendo a ordem
+        branches_to_try = list(dict.fromkeys(branches_to_try))
+
         # Tenta cada branch até encontrar uma que funcione
         for try_branch in branches_to_try:
             zip_url = f"{clean_url}/archive/refs/heads/{try_branch}.zip"
-            print(f"🌐 Tentando acessar branch '{try_branch}': {zip_url}")
-            
-            async with client.stream("GET", zip_url, headers=headers) as response:
-                print(f"📊 Status Code: {response.status_code}")
-                
-                if response.status_code == 200:
-                    # Validação de Content-Length
-                    content_length = response.headers.get("content-length")
-                    if content_length and int(content_length) > MAX_REPO_SIZE_BYTES:
-                        raise HTTPException(
-                            status_code=413,
-                            detail=f"Repositório muito grande ({int(content_length) / 1024 / 1024:.2f} MB). O limite é {MAX_REPO_SIZE_BYTES / 1024 / 1024} MB.",
-                        )
+            file_bytes = await _download_zip(zip_url, headers)
+            if file_bytes is not None:
+                break
+            log.info("branch_not_found", extra={"branch": try_branch})
 
-                    # Se passou na verificação, lemos o conteúdo para a memória
-                    file_bytes = await response.aread()
-                    successful_branch = try_branch
-                    print(f"✅ Branch '{try_branch}' encontrada!")
-                    break
-                elif response.status_code == 404:
-                    print(f"⚠️ Branch '{try_branch}' não encontrada, tentando próxima...")
-                    continue
-                else:
-                    raise HTTPException(
-                        status_code=400, detail=f"Erro no GitHub: {response.status_code}"
-                    )
-        
         # Se nenhuma branch funcionou
         if file_bytes is None:
-            print(f"❌ Nenhuma branch encontrada. Tentativas: {branches_to_try}")
-            raise HTTPException(
+            log.warning("repo_not_found", extra={"branches": branches_to_try})
+            raise ExtractError(
                 status_code=404,
                 detail=f"Repositório não encontrado. Tentei as branches: {', '.join(branches_to_try)}. Verifique a URL ou se o Token é válido.",
             )
 
-    # Aguarda os metadados do GitHub
-    github_info = await metadata_task
+    # Descompactar e analisar os arquivos é trabalho de CPU: roda em outro
+    # processo para não travar o event loop (e as demais requisições)
+    result, error = await run_cpu_bound(_process_zip_worker, file_bytes)
+    if error is not None:
+        status_code, detail = error
+        raise ExtractError(status_code=status_code, detail=detail)
+    return result
+
+
+def _process_zip_worker(
+    file_bytes: bytes,
+) -> tuple[Optional[dict], Optional[tuple[int, str]]]:
+    """
+    `_process_zip` para rodar em outro processo. ExtractError não volta
+    pelo pickle, então o erro é devolvido como (status, detalhe).
+    """
+    try:
+        return _process_zip(file_bytes), None
+    except ExtractError as e:
+        return None, (e.status_code, e.detail)
+
+
+def _process_zip(file_bytes: bytes) -> dict:
+    """
+    Processa o ZIP do repositório (síncrono, executado fora do event loop).
+    Retorna estatísticas, dependências, estrutura e payload priorizado.
+    """
+    file_analyzer = FileAnalyzer(
+        ignored_dirs=IGNORED_DIRS, ignored_extensions=IGNORED_EXTENSIONS
+    )
 
     # === PROCESSAMENTO DO ZIP COM PRIORIZAÇÃO ===
     file_contents_buffer = []  # Lista para ordenação por prioridade
@@ -350,38 +494,41 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
                     continue
 
                 try:
-                    with z.open(file_info) as f:
-                        content = f.read()
-
-                        # Analisa o arquivo (estatísticas são coletadas para TODOS os arquivos)
-                        should_process, decoded_content = file_analyzer.analyze_file(
-                            filepath=file_info.filename,
-                            content=content,
-                            size_bytes=file_info.file_size,
-                        )
-
-                        if should_process and decoded_content:
-                            # Calcula prioridade para ordenação
-                            priority = get_file_priority(file_info.filename)
-
-                            # Remove o prefixo da pasta raiz do zip (nome-branch/)
-                            clean_path = "/".join(file_info.filename.split("/")[1:])
+                    # Arquivos ignorados (node_modules, imagens, binários...)
+                    # só entram nas estatísticas: o conteúdo nem é descomprimido
+                    content = None
+                    if not file_analyzer.is_ignored(file_info.filename):
+                        content = z.read(file_info)
+
+                    # Analisa o arquivo (estatísticas são coletadas para TODOS os arquivos)
+                    should_process, decoded_content = file_analyzer.analyze_file(
+                        filepath=file_info.filename,
+                        content=content,
+                        size_bytes=file_info.file_size,
+                    )
 
-                            # Armazena para ordenação posterior
-                            file_contents_buffer.append(
-                                {
-                                    "priority": priority,
-                                    "path": clean_path,
-                                    "content": decoded_content,
-                                    "size": len(decoded_content),
-                                }
-                            )
+                    if should_process and decoded_content:
+                        # Calcula prioridade para ordenação
+                        priority = get_file_priority(file_info.filename)
+
+                        # Remove o prefixo da pasta raiz do zip (nome-branch/)
+                        clean_path = "/".join(file_info.filename.split("/")[1:])
+
+                        # Armazena para ordenação posterior
+                        file_contents_buffer.append(
+                            {
+                                "priority": priority,
+                                "path": clean_path,
+                                "content": decoded_content,
+                                "size": len(decoded_content),
+                            }
+                        )
 
                 except Exception as e:
                     errors.append(f"Erro ao ler {file_info.filename}: {str(e)}")
 
     except zipfile.BadZipFile:
-        raise HTTPException(
+        raise ExtractError(
             status_code=400, detail="O arquivo baixado não é um ZIP válido."
         )
 
@@ -397,7 +544,7 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
     sorted_files = sorted(file_contents_buffer, key=lambda x: x["priority"])
 
     # Inicia o contexto com a estrutura de diretórios (muito útil para a IA)
-    tree_representation = generate_tree_text(dir_structure)
+    tree_representation = generate_tree_text(dir_structure, MAX_TREE_CHARS)
 
     # Limita a estrutura de diretórios para repos gigantes
     if len(tree_representation) > MAX_TREE_CHARS:
@@ -409,16 +556,15 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
     final_context = f"PROJECT FILE STRUCTURE:\n```\n{tree_representation}```\n\n"
     final_context += "SELECTED FILE CONTENTS (ordered by relevance):\n"
 
-    current_chars = len(final_context)
-    included_files_count = 0
-    included_files_list = []
-
+    # Candidatos ao contexto: só Docs e Config (Tier 2 fica de fora)
+    sections = []
     for file_data in sorted_files:
-        # IGNORA arquivos de código (Tier 2) - foca apenas em Docs e Config
         if file_data["priority"] >= 2:
-            continue
+            break
 
-        content_to_use = file_data["content"]
+        # Remove ruído (badges, comentários HTML, espaços) antes de medir o
+        # tamanho, para caber mais conteúdo útil no orçamento
+        content_to_use = compress_context(file_data["content"])
         is_truncated = False
 
         # Limita o tamanho individual do arquivo para não monopolizar o contexto
@@ -429,30 +575,38 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
             )
             is_truncated = True
 
-        # Formata o bloco do arquivo
-        file_block = f"\n<file path='{file_data['path']}'>\n{content_to_use}\n</file>\n"
-        block_len = len(file_block)
-
-        # Se couber no orçamento, adiciona
-        if current_chars + block_len <= MAX_CONTEXT_CHARS:
-            final_context += file_block
-            current_chars += block_len
-            included_files_count += 1
-            if is_truncated:
-                included_files_list.append(f"{file_data['path']} (truncated)")
-            else:
-                included_files_list.append(file_data["path"])
-        else:
-            # Tenta truncar para caber
-            remaining = MAX_CONTEXT_CHARS - current_chars
-            if remaining > 500:  # Só adiciona se sobrar um pedaço útil
-                truncated_content = (
-                    content_to_use[: remaining - 150] + "\n... [CONTEXT LIMIT REACHED]"
-                )
-                final_context += f"\n<file path='{file_data['path']}'>\n{truncated_content}\n</file>\n"
-                included_files_count += 1
-                included_files_list.append(f"{file_data['path']} (truncated)")
-            break  # Contexto cheio
+        # Tags do bloco + marcador de corte, reservados no orçamento
+        overhead = len(f"\n<file path='{file_data['path']}'>\n\n</file>\n") + len(
+            CONTEXT_LIMIT_MARKER
+        )
+        sections.append((file_data["path"], content_to_use, is_truncated, overhead))
+
+    # Se nem tudo couber, cada arquivo é cortado no mesmo limite T (os menores
+    # entram inteiros) em vez de cortar só o final do contexto. Se T ficar
+    # pequeno demais, os arquivos menos prioritários saem até sobrar espaço.
+    budget = MAX_CONTEXT_CHARS - len(final_context)
+    threshold = 0
+    while sections:
+        lengths = [len(content) for _, content, _, _ in sections]
+        available = budget - sum(overhead for *_, overhead in sections)
+        if sum(lengths) <= available:
+            threshold = max(lengths)
+            break
+        threshold = _section_threshold(lengths, available)
+        if threshold >= MIN_SECTION_CHARS:
+            break
+        sections.pop()
+
+    included_files_count = len(sections)
+    included_files_list = []
+
+    for path, content_to_use, is_truncated, _ in sections:
+        if len(content_to_use) > threshold:
+            content_to_use = content_to_use[:threshold] + CONTEXT_LIMIT_MARKER
+            is_truncated = True
+
+        final_context += f"\n<file path='{path}'>\n{content_to_use}\n</file>\n"
+        included_files_list.append(f"{path} (truncated)" if is_truncated else path)
 
     # === FORMATA ESTATÍSTICAS ===
     category_stats = {}
@@ -480,8 +634,6 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
         )
 
     return {
-        # Informações do GitHub (metadados)
-        "github": github_info,
         # Estatísticas de arquivos
         "file_stats": {
             "total_files": analysis.total_files,
@@ -515,6 +667,43 @@ async def download_and_extract(github_url: str, branch: str = None, token: str =
     }
 
 
+async def download_and_extract(
+    github_url: str,
+    branch: str = None,
+    token: str = None,
+    concurrency: int = GITHUB_API_CONCURRENCY,
+    metadata_task: Optional[asyncio.Task] = None,
+) -> dict:
+    """
+    Baixa o repositório, PRIORIZA arquivos descritivos e monta contexto limitado.
+    Retorna informações completas sobre o repositório com payload otimizado.
+
+    `concurrency` limita quantas chamadas à API do GitHub rodam ao mesmo tempo.
+    `metadata_task` reaproveita uma busca de metadados já iniciada pelo chamador.
+    """
+    # Busca metadados do GitHub em paralelo com o download
+    if metadata_task is None:
+        metadata_task = asyncio.create_task(
+            fetch_metadata(github_url, token, concurrency)
+        )
+
+    try:
+        payload_result = await fetch_payload(
+            github_url, branch=branch, token=token, metadata_task=metadata_task
+        )
+    except BaseException as e:
+        metadata_task.cancel()
+        if isinstance(e, ExtractError):
+            e.github_url = github_url
+        raise
+
+    return {
+        # Informações do GitHub (metadados)
+        "github": await metadata_task,
+        **payload_result,
+    }
+
+
 def _format_bytes(size_bytes: int) -> str:
     """Formata bytes para uma string legível."""
     for unit in ["B", "KB", "MB", "GB"]:
@@ -0,0 +1,108 @@
+"""
+Cache das extrações de repositório, por commit.
+
+Evita baixar e processar o mesmo ZIP várias vezes quando o usuário passa
+por diferentes telas (contexto, overview, ...) do mesmo repositório.
+"""
+
+import asyncio
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+from core.config import settings
+from services.cache import TTLCache
+from services.extract import download_and_extract, fetch_metadata
+from services.github_api import GitHubAPIService
+
+
+@dataclass
+class CachedExtraction:
+    """Resultado de uma extração e os valores derivados dele (ex.: prompts)."""
+
+    result: dict
+    derived: dict[str, Any] = field(default_factory=dict)
+
+
+# Extrações por (url, branch, SHA do commit)
+_extract_cache = TTLCache(
+    ttl_seconds=settings.EXTRACT_CACHE_TTL_SECONDS,
+    max_entries=settings.EXTRACT_CACHE_MAX_ENTRIES,
+)
+
+# Um lock por chave: requisições simultâneas para o mesmo commit esperam a
+# primeira extração em vez de baixarem o ZIP em paralelo. O lock some
+# sozinho quando ninguém mais o usa.
+_locks: "weakref.WeakValueDictionary[Hashable, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+async def _get_entry(
+    github_url: str, branch: Optional[str], token: Optional[str]
+) -> CachedExtraction:
+    """
+    Busca a extração no cache ou a executa. O SHA é resolvido com o token do
+    chamador, então um repositório privado só é servido do cache para quem
+    tem acesso a ele.
+
+    Sem SHA (API indisponível, repositório inacessível) não há cache: a
+    extração roda normalmente e devolve o erro de sempre, se houver.
+    """
+    # Os metadados são necessários em qualquer extração: a busca começa já,
+    # em paralelo com a resolução do SHA, e é cancelada se o cache responder
+    metadata_task = asyncio.create_task(fetch_metadata(github_url, token))
+    try:
+        head_sha = await GitHubAPIService(token=token).get_head_sha(
+            github_url, branch
+        )
+        if not head_sha:
+            result = await download_and_extract(
+                github_url, branch=branch, token=token, metadata_task=metadata_task
+            )
+            return CachedExtraction(result)
+
+        key = (github_url.rstrip("/"), branch, head_sha)
+
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = asyncio.Lock()
+
+        async with lock:
+            entry = _extract_cache.get(key)
+            if entry is None:
+                result = await download_and_extract(
+                    github_url, branch=branch, token=token, metadata_task=metadata_task
+                )
+                entry = CachedExtraction(result)
+                _extract_cache.set(key, entry)
+    finally:
+        metadata_task.cancel()
+
+    return entry
+
+
+async def get_or_extract_derived(
+    github_url: str,
+    branch: Optional[str],
+    token: Optional[str],
+    name: str,
+    build: Callable[[dict], Any],
+) -> tuple[dict, Any]:
+    """
+    Retorna a extração junto com um valor derivado dela (ex.: o prompt
+    montado), calculado por `build(result)` uma única vez por extração em
+    cache. `build` deve ser determinístico e não alterar `result`.
+    """
+    entry = await _get_entry(github_url, branch, token)
+
+    value = entry.derived.get(name)
+    if value is None:
+        # Contextos grandes (tokenização, montagem de prompt) saem do event loop
+        if len(entry.result.get("payload", "")) > settings.CPU_OFFLOAD_MIN_CHARS:
+            value = await asyncio.to_thread(build, entry.result)
+        else:
+            value = build(entry.result)
+        entry.derived[name] = value
+
+    return dict(entry.result), value
@@ -0,0 +1,55 @@
+"""
+Overview montado só com os metadados do GitHub, para repositórios sem
+contexto suficiente para a IA (sem README/configs): evita uma chamada ao
+Gemini que só produziria texto genérico. Também define quando um overview
+gerado pela IA está completo.
+"""
+
+import html
+
+from core.prompt_template import PromptTemplate
+
+# Abaixo deste tamanho de contexto a IA não tem o que analisar: o overview é
+# montado direto dos metadados, sem chamar o Gemini
+MIN_CONTEXT_CHARS_FOR_AI = 500
+
+# Overview usado quando não há contexto suficiente (valores já escapados)
+FALLBACK_OVERVIEW = PromptTemplate(
+    """<h2 class="overview-title">📦 {repo_name}</h2>
+<p>{description}</p>
+<div class="overview-section">
+<ul class="feature-list">
+<li><strong>Main language:</strong> {language}</li>
+<li><strong>Stars:</strong> {stars} ⭐ | <strong>Forks:</strong> {forks} 🍴</li>
+<li><strong>Last update:</strong> {updated_at}</li>
+</ul>
+</div>
+<p><em>This repository does not have enough documentation or configuration files for a detailed overview.</em></p>"""
+)
+
+# Overview mínimo aceitável: abaixo disso (ou sem o título <h2>) a geração
+# é refeita com o modelo de fallback e o resultado não entra no cache
+MIN_OVERVIEW_CHARS = 500
+
+
+def is_complete_overview(content: str) -> bool:
+    """Indica se o overview gerado tem o tamanho e a estrutura esperados."""
+    return len(content) >= MIN_OVERVIEW_CHARS and "<h2" in content
+
+
+# Uso de tokens informado quando o Gemini não é chamado
+NO_AI_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def render_fallback_overview(metadata: dict) -> str:
+    """Monta um overview simples em HTML apenas com os metadados do GitHub."""
+    return FALLBACK_OVERVIEW.render(
+        repo_name=html.escape(metadata.get("full_name") or "Repository"),
+        description=html.escape(
+            metadata.get("description") or "No description available."
+        ),
+        language=html.escape(metadata.get("language") or "N/A"),
+        stars=metadata.get("stars", 0),
+        forks=metadata.get("forks", 0),
+        updated_at=html.escape(metadata.get("updated_at") or "N/A"),
+    )
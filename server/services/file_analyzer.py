@@ -4,6 +4,7 @@ Responsável por categorizar e contar arquivos, linhas de código, dependências
 """
 
 import re
+import sys
 from dataclasses import dataclass, field
 from typing import Optional
 from pathlib import PurePosixPath
@@ -105,6 +106,13 @@ FILE_CATEGORIES = {
     },
 }
 
+# Categoria de cada extensão: uma busca por arquivo, sem percorrer as categorias
+EXTENSION_CATEGORY = {
+    extension: category
+    for category, extensions in FILE_CATEGORIES.items()
+    for extension in extensions
+}
+
 # Arquivos de dependência conhecidos
 DEPENDENCY_FILES = {
     "package.json": "npm",
@@ -184,6 +192,9 @@ class AnalysisResult:
     directory_structure: DirectoryNode
     files_by_extension: dict[str, int]
 
+# Arquivos ocultos que ainda assim são analisados
+ALLOWED_HIDDEN_FILES = {".env.example", ".gitignore", "Dockerfile", ".dockerignore"}
+
 
 class FileAnalyzer:
     """Analisador de arquivos do repositório."""
@@ -224,11 +235,7 @@ class FileAnalyzer:
 
     def _get_file_category(self, extension: str) -> str:
         """Determina a categoria de um arquivo pela extensão."""
-        ext_lower = extension.lower()
-        for category, extensions in FILE_CATEGORIES.items():
-            if ext_lower in extensions:
-                return category
-        return "other"
+        return EXTENSION_CATEGORY.get(extension.lower(), "other")
 
     def _is_in_ignored_dir(self, filepath: str) -> bool:
         """Verifica se o arquivo está em um diretório ignorado."""
@@ -239,6 +246,23 @@ class FileAnalyzer:
         """Verifica se a extensão deve ser ignorada."""
         return extension.lower() in self.ignored_extensions
 
+    def _is_ignored(self, filepath: str, extension: str, basename: str) -> bool:
+        """Verifica se o arquivo fica fora da análise de conteúdo."""
+        if self._is_in_ignored_dir(filepath) or self._is_ignored_extension(extension):
+            return True
+
+        # Arquivos ocultos (exceto alguns permitidos)
+        return basename.startswith(".") and basename not in ALLOWED_HIDDEN_FILES
+
+    def is_ignored(self, filepath: str) -> bool:
+        """
+        Indica se `analyze_file` vai ignorar o arquivo. Permite pular a
+        leitura (e descompressão) do conteúdo de arquivos que só entram
+        nas estatísticas.
+        """
+        path = PurePosixPath(filepath)
+        return self._is_ignored(filepath, path.suffix.lower(), path.name)
+
     def _add_to_directory_structure(self, filepath: str):
         """Adiciona um arquivo à estrutura de diretórios."""
         # Remove o prefixo do repo (ex: repo-main/)
@@ -246,8 +270,12 @@ class FileAnalyzer:
         if len(parts) > 1:
             parts = parts[1:]  # Remove o diretório raiz do zip
 
+        # Nomes internados: "src", "index.ts", "__init__.py"... se repetem
+        # pela árvore inteira e passam a ser um único objeto (menos memória e
+        # um pickle menor ao voltar do processo de análise)
         current = self.directory_root
         for i, part in enumerate(parts):
+            part = sys.intern(part)
             is_file = i == len(parts) - 1
 
             if part not in current.children:
@@ -364,16 +392,7 @@ class FileAnalyzer:
         self._add_to_directory_structure(filepath)
 
         # Verifica se deve ser ignorado
-        is_ignored = self._is_in_ignored_dir(filepath) or self._is_ignored_extension(
-            extension
-        )
-
-        # Arquivos ocultos (exceto alguns permitidos)
-        allowed_hidden = {".env.example", ".gitignore", "Dockerfile", ".dockerignore"}
-        if basename.startswith(".") and basename not in allowed_hidden:
-            is_ignored = True
-
-        if is_ignored:
+        if self._is_ignored(filepath, extension, basename):
             self.ignored_files[category] = self.ignored_files.get(category, 0) + 1
             return False, None
 
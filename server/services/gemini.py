@@ -5,19 +5,208 @@ Gerencia chamadas assíncronas com controle de timeout e tamanho.
 
 import httpx
 import asyncio
-from typing import Optional
+import gzip
+import json
+import logging
+import orjson
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Optional
 from core.config import settings
+from services.http_client import get_http_client
+from services.rate_limiter import RateLimiter
+
+log = logging.getLogger("nexo.gemini")
+
+# Erro retornado quando todas as vagas de chamada ao Gemini estão ocupadas
+CAPACITY_EXCEEDED_ERROR = "Capacidade do Gemini esgotada - tente novamente em instantes"
+
+# Recusas do corpo comprimido seguidas até o gzip ser desativado no processo
+GZIP_MAX_REJECTIONS = 3
+
+# Filtros de segurança (iguais em todas as chamadas; montados uma vez e
+# compartilhados - nunca alterados)
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+
+@lru_cache(maxsize=32)
+def _generation_config(max_output_tokens: int, temperature: float) -> dict:
+    """
+    Parâmetros de geração. Cada endpoint usa sempre os mesmos valores, então
+    o dict é montado uma vez por combinação e compartilhado (não alterar).
+    """
+    return {
+        "temperature": temperature,
+        "maxOutputTokens": max_output_tokens,
+        "topP": 0.95,
+        "topK": 40,
+    }
 
 
 class GeminiService:
     """Serviço para interação com a API do Gemini."""
 
-    BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+    API_URL = "https://generativelanguage.googleapis.com/v1beta"
+    BASE_URL = f"{API_URL}/models"
+
+    JSON_HEADERS = {"Content-Type": "application/json"}
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.GEMINI_API_KEY
         self.model = settings.GEMINI_MODEL
+        self.fallback_model = settings.GEMINI_FALLBACK_MODEL
         self.max_tokens = settings.GEMINI_MAX_TOKENS
+        # Corpos a partir deste tamanho vão comprimidos (0 desativa)
+        self.gzip_min_bytes = settings.GEMINI_GZIP_MIN_BYTES
+        self._gzip_rejections = 0
+        # Limita as chamadas simultâneas (cota da API); quem espera demais
+        # por uma vaga recebe erro em vez de ficar na fila indefinidamente
+        self._slots = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENT)
+        self.queue_timeout = settings.GEMINI_QUEUE_TIMEOUT_SECONDS
+        # Cota de chamadas por minuto (0 = sem limite)
+        self._rate = (
+            RateLimiter(settings.GEMINI_REQUESTS_PER_MINUTE)
+            if settings.GEMINI_REQUESTS_PER_MINUTE > 0
+            else None
+        )
+
+    async def _acquire_slot(self) -> bool:
+        """Aguarda uma vaga para chamar a API. Retorna False se o tempo esgotar."""
+        try:
+            await asyncio.wait_for(self._acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            log.warning("gemini_capacity_exceeded")
+            return False
+        return True
+
+    async def _acquire(self):
+        """Ocupa uma vaga de concorrência e, depois, um token da cota por minuto."""
+        await self._slots.acquire()
+        if self._rate is None:
+            return
+        try:
+            await self._rate.acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _build_payload(
+        self, prompt: str, max_output_tokens: int, temperature: float
+    ) -> dict:
+        """Monta o corpo da requisição (comum às chamadas normal e em streaming)."""
+        return {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": _generation_config(max_output_tokens, temperature),
+            "safetySettings": SAFETY_SETTINGS,
+        }
+
+    @staticmethod
+    def _encode_payload(payload: dict) -> bytes:
+        """
+        Serializa o corpo direto para bytes UTF-8 (orjson), sem a string
+        intermediária de `json.dumps` + `encode` - relevante para prompts grandes.
+        """
+        return orjson.dumps(payload)
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        body: bytes,
+        timeout: float,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """
+        Envia o POST, comprimindo com gzip corpos grandes (prompts de ~100KB
+        de texto repetitivo encolhem bastante).
+
+        Se o servidor recusar o corpo comprimido, reenvia sem compressão;
+        após GZIP_MAX_REJECTIONS recusas seguidas, desativa o gzip para as
+        próximas chamadas deste processo. Outros erros (chave inválida,
+        prompt grande demais...) voltam como vieram, sem reenvio.
+        """
+        compress = 0 < self.gzip_min_bytes <= len(body)
+        if compress:
+            request = client.build_request(
+                "POST",
+                url,
+                content=gzip.compress(body, compresslevel=5),
+                headers={**self.JSON_HEADERS, "Content-Encoding": "gzip"},
+                timeout=timeout,
+            )
+            response = await client.send(request, stream=stream)
+            if not await self._is_gzip_rejected(response):
+                if response.is_success:
+                    self._gzip_rejections = 0
+                return response
+
+            await response.aclose()
+            self._gzip_rejections += 1
+            if self._gzip_rejections >= GZIP_MAX_REJECTIONS:
+                self.gzip_min_bytes = 0
+            log.warning(
+                "gzip_rejected",
+                extra={
+                    "status_code": response.status_code,
+                    "rejections": self._gzip_rejections,
+                },
+            )
+
+        request = client.build_request(
+            "POST", url, content=body, headers=self.JSON_HEADERS, timeout=timeout
+        )
+        return await client.send(request, stream=stream)
+
+    @staticmethod
+    async def _is_gzip_rejected(response: httpx.Response) -> bool:
+        """
+        Indica se o erro é a recusa do corpo comprimido: 415, ou um 4xx cuja
+        mensagem cita o Content-Encoding (um 400 comum não conta).
+        """
+        if response.status_code == 415:
+            return True
+        if not 400 <= response.status_code < 500:
+            return False
+        # Corpo de erro é pequeno; lido aqui, continua disponível ao chamador
+        await response.aread()
+        message = response.text.lower()
+        return "content-encoding" in message or "gzip" in message
+
+    @staticmethod
+    def _parse_usage(data: dict) -> dict:
+        """Extrai os metadados de uso de tokens de uma resposta do Gemini."""
+        usage = data.get("usageMetadata", {})
+        return {
+            "prompt_tokens": usage.get("promptTokenCount", 0),
+            "completion_tokens": usage.get("candidatesTokenCount", 0),
+            "total_tokens": usage.get("totalTokenCount", 0),
+            "model": data.get("modelVersion"),
+        }
+
+    def _parse_response(self, data: dict) -> dict:
+        """Extrai o texto e o uso de tokens de uma resposta `generateContent`."""
+        candidates = data.get("candidates", [])
+        if not candidates:
+            return {
+                "success": False,
+                "error": "Nenhuma resposta gerada pelo modelo",
+                "content": None,
+            }
+
+        content = candidates[0].get("content", {})
+        parts = content.get("parts", [])
+        text = parts[0].get("text", "") if parts else ""
+
+        return {
+            "success": True,
+            "content": text,
+            "error": None,
+            "usage": self._parse_usage(data),
+        }
 
     async def generate_content(
         self,
@@ -25,6 +214,7 @@ class GeminiService:
         max_output_tokens: int = 4096,
         temperature: float = 0.7,
         timeout: float = 60.0,
+        model: Optional[str] = None,
     ) -> dict:
         """
         Gera conteúdo usando o Gemini API.
@@ -34,85 +224,82 @@ class GeminiService:
             max_output_tokens: Máximo de tokens na resposta
             temperature: Criatividade (0.0 a 1.0)
             timeout: Timeout em segundos
+            model: Modelo a usar (padrão: GEMINI_MODEL)
 
         Returns:
             Dict com 'success', 'content' ou 'error'
         """
-        if not self.api_key:
+        if not await self._acquire_slot():
             return {
                 "success": False,
-                "error": "GEMINI_API_KEY não configurada",
+                "error": CAPACITY_EXCEEDED_ERROR,
                 "content": None,
             }
-
-        url = f"{self.BASE_URL}/{self.model}:generateContent?key={self.api_key}"
-
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_output_tokens,
-                "topP": 0.95,
-                "topK": 40,
-            },
-            "safetySettings": [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_NONE",
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE",
-                },
-            ],
-        }
-
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(url, json=payload)
+            return await self._generate_content(
+                prompt, max_output_tokens, temperature, timeout, model or self.model
+            )
+        finally:
+            self._slots.release()
 
-                if response.status_code != 200:
-                    error_data = response.json() if response.content else {}
-                    error_msg = error_data.get("error", {}).get(
-                        "message", f"HTTP {response.status_code}"
-                    )
-                    return {
-                        "success": False,
-                        "error": f"Gemini API Error: {error_msg}",
-                        "content": None,
-                    }
+    async def generate_content_checked(
+        self, prompt: str, accept: Callable[[str], bool], **kwargs
+    ) -> dict:
+        """
+        Como `generate_content`, mas se a resposta não passar em `accept`
+        tenta uma vez com o modelo de fallback (GEMINI_FALLBACK_MODEL).
+        Se a nova tentativa falhar, fica a resposta original.
+        """
+        result = await self.generate_content(prompt, **kwargs)
+        fallback = self.fallback_model
+        if (
+            not result["success"]
+            or accept(result["content"])
+            or not fallback
+            or fallback == kwargs.get("model", self.model)
+        ):
+            return result
 
-                data = response.json()
+        log.info("gemini_fallback", extra={"model": fallback})
+        retry = await self.generate_content(prompt, **{**kwargs, "model": fallback})
+        return retry if retry["success"] else result
 
-                # Extrai o texto da resposta
-                candidates = data.get("candidates", [])
-                if not candidates:
-                    return {
-                        "success": False,
-                        "error": "Nenhuma resposta gerada pelo modelo",
-                        "content": None,
-                    }
+    async def _generate_content(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        timeout: float,
+        model: str,
+    ) -> dict:
+        if not self.api_key:
+            return {
+                "success": False,
+                "error": "GEMINI_API_KEY não configurada",
+                "content": None,
+            }
 
-                content = candidates[0].get("content", {})
-                parts = content.get("parts", [])
-                text = parts[0].get("text", "") if parts else ""
+        url = f"{self.BASE_URL}/{model}:generateContent?key={self.api_key}"
+        body = self._encode_payload(
+            self._build_payload(prompt, max_output_tokens, temperature)
+        )
 
-                # Metadados de uso
-                usage = data.get("usageMetadata", {})
+        try:
+            response = await self._send(get_http_client(), url, body, timeout)
 
+            if response.status_code != 200:
+                error_data = response.json() if response.content else {}
+                error_msg = error_data.get("error", {}).get(
+                    "message", f"HTTP {response.status_code}"
+                )
                 return {
-                    "success": True,
-                    "content": text,
-                    "error": None,
-                    "usage": {
-                        "prompt_tokens": usage.get("promptTokenCount", 0),
-                        "completion_tokens": usage.get("candidatesTokenCount", 0),
-                        "total_tokens": usage.get("totalTokenCount", 0),
-                    },
+                    "success": False,
+                    "error": f"Gemini API Error: {error_msg}",
+                    "content": None,
                 }
 
+            return self._parse_response(response.json())
+
         except httpx.TimeoutException:
             return {
                 "success": False,
@@ -132,6 +319,220 @@ class GeminiService:
                 "content": None,
             }
 
+    async def generate_content_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int = 4096,
+        temperature: float = 0.7,
+        timeout: float = 60.0,
+    ) -> AsyncIterator[dict]:
+        """
+        Gera conteúdo em streaming (`streamGenerateContent` via SSE).
+
+        Emite eventos à medida que o modelo gera o texto:
+            {"type": "delta", "text": "..."}  - trecho novo do conteúdo
+            {"type": "done", "usage": {...}}  - fim da geração
+            {"type": "error", "error": "..."} - falha (encerra o stream)
+        """
+        if not await self._acquire_slot():
+            yield {"type": "error", "error": CAPACITY_EXCEEDED_ERROR}
+            return
+        try:
+            async for event in self._generate_content_stream(
+                prompt, max_output_tokens, temperature, timeout
+            ):
+                yield event
+        finally:
+            self._slots.release()
+
+    async def _generate_content_stream(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        timeout: float,
+    ) -> AsyncIterator[dict]:
+        if not self.api_key:
+            yield {"type": "error", "error": "GEMINI_API_KEY não configurada"}
+            return
+
+        url = (
+            f"{self.BASE_URL}/{self.model}:streamGenerateContent"
+            f"?alt=sse&key={self.api_key}"
+        )
+        body = self._encode_payload(
+            self._build_payload(prompt, max_output_tokens, temperature)
+        )
+
+        usage = None
+        received_text = False
+
+        try:
+            response = await self._send(
+                get_http_client(), url, body, timeout, stream=True
+            )
+            try:
+                if response.status_code != 200:
+                    error_body = await response.aread()
+                    try:
+                        error_data = json.loads(error_body) if error_body else {}
+                    except ValueError:
+                        error_data = {}
+                    if isinstance(error_data, list):
+                        error_data = error_data[0] if error_data else {}
+                    error_msg = error_data.get("error", {}).get(
+                        "message", f"HTTP {response.status_code}"
+                    )
+                    yield {
+                        "type": "error",
+                        "error": f"Gemini API Error: {error_msg}",
+                    }
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+
+                    data = json.loads(line[5:])
+
+                    for candidate in data.get("candidates", [])[:1]:
+                        parts = candidate.get("content", {}).get("parts", [])
+                        text = "".join(part.get("text", "") for part in parts)
+                        if text:
+                            received_text = True
+                            yield {"type": "delta", "text": text}
+
+                    # O último evento traz o total de tokens consumidos
+                    if "usageMetadata" in data:
+                        usage = self._parse_usage(data)
+            finally:
+                await response.aclose()
+
+        except httpx.TimeoutException:
+            yield {
+                "type": "error",
+                "error": f"Timeout após {timeout}s - tente com um contexto menor",
+            }
+            return
+        except httpx.RequestError as e:
+            yield {"type": "error", "error": f"Erro de conexão: {str(e)}"}
+            return
+        except Exception as e:
+            yield {"type": "error", "error": f"Erro inesperado: {str(e)}"}
+            return
+
+        if not received_text:
+            yield {"type": "error", "error": "Nenhuma resposta gerada pelo modelo"}
+            return
+
+        yield {"type": "done", "usage": usage}
+
+    async def create_batch(
+        self,
+        prompts: dict[str, str],
+        max_output_tokens: int = 4096,
+        temperature: float = 0.7,
+        timeout: float = 60.0,
+    ) -> dict:
+        """
+        Envia vários prompts à Batch API (`batchGenerateContent`): metade do
+        custo, em troca de uma resposta que pode levar minutos ou horas.
+
+        Args:
+            prompts: Prompts por chave (a chave identifica cada resultado)
+
+        Returns:
+            Dict com 'success' e 'name' (nome do lote, para `get_batch`) ou 'error'
+        """
+        if not self.api_key:
+            return {"success": False, "error": "GEMINI_API_KEY não configurada"}
+
+        generation_config = _generation_config(max_output_tokens, temperature)
+        requests = [
+            {
+                "request": {
+                    "contents": [{"parts": [{"text": prompt}]}],
+                    "generationConfig": generation_config,
+                    "safetySettings": SAFETY_SETTINGS,
+                },
+                "metadata": {"key": key},
+            }
+            for key, prompt in prompts.items()
+        ]
+        body = self._encode_payload(
+            {
+                "batch": {
+                    "display_name": "nexo-overviews",
+                    "input_config": {"requests": {"requests": requests}},
+                }
+            }
+        )
+        url = f"{self.BASE_URL}/{self.model}:batchGenerateContent?key={self.api_key}"
+
+        try:
+            response = await self._send(get_http_client(), url, body, timeout)
+            data = response.json() if response.content else {}
+        except (httpx.RequestError, ValueError) as e:
+            return {"success": False, "error": f"Erro de conexão: {str(e)}"}
+
+        if response.status_code != 200:
+            error_msg = data.get("error", {}).get(
+                "message", f"HTTP {response.status_code}"
+            )
+            return {"success": False, "error": f"Gemini API Error: {error_msg}"}
+
+        return {"success": True, "name": data["name"], "error": None}
+
+    async def get_batch(self, name: str, timeout: float = 30.0) -> dict:
+        """
+        Consulta um lote criado por `create_batch`.
+
+        Returns:
+            Dict com 'done' e, quando concluído, 'results' (resultado de cada
+            chave, no formato de `generate_content`) ou 'error' (lote inteiro)
+        """
+        url = f"{self.API_URL}/{name}?key={self.api_key}"
+        try:
+            response = await get_http_client().get(url, timeout=timeout)
+            data = response.json() if response.content else {}
+        except (httpx.RequestError, ValueError) as e:
+            # Falha na consulta não encerra o lote: tenta de novo depois
+            log.warning("gemini_batch_poll_failed", extra={"err": str(e)})
+            return {"done": False}
+
+        if response.status_code != 200:
+            error_msg = data.get("error", {}).get(
+                "message", f"HTTP {response.status_code}"
+            )
+            log.warning("gemini_batch_poll_failed", extra={"err": error_msg})
+            return {"done": False}
+
+        if not data.get("done"):
+            return {"done": False}
+
+        if "error" in data:
+            error_msg = data["error"].get("message", "Lote falhou")
+            return {"done": True, "error": f"Gemini API Error: {error_msg}"}
+
+        # Respostas inline, na ordem dos pedidos e identificadas pela chave
+        inlined = data.get("response", {}).get("inlinedResponses", {})
+        if isinstance(inlined, dict):
+            inlined = inlined.get("inlinedResponses", [])
+
+        results = {}
+        for item in inlined:
+            key = item.get("metadata", {}).get("key")
+            if "response" in item:
+                results[key] = self._parse_response(item["response"])
+            else:
+                error_msg = item.get("error", {}).get("message", "Erro desconhecido")
+                results[key] = {
+                    "success": False,
+                    "error": f"Gemini API Error: {error_msg}",
+                    "content": None,
+                }
+        return {"done": True, "results": results, "error": None}
+
 
 # Instância global do serviço
 gemini_service = GeminiService()
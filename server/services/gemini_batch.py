@@ -0,0 +1,152 @@
+"""
+Fila de prompts para a Batch API do Gemini.
+
+Gerações sem pressa (ex.: pré-calcular overviews de vários repositórios)
+entram na fila e recebem um ID; um worker em segundo plano junta os prompts
+em lotes, envia à Batch API (metade do custo) e consulta o lote até
+concluir. Os resultados ficam disponíveis por ID até expirarem.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Optional
+
+from core.config import settings
+from services.cache import TTLCache
+from services.gemini import gemini_service
+
+log = logging.getLogger("nexo.gemini_batch")
+
+
+class GeminiBatchQueue:
+    """
+    Fila de prompts e resultados da Batch API, por ID.
+
+    Todos os prompts de um lote usam os mesmos parâmetros de geração.
+    Os resultados ficam em memória (se perdem ao reiniciar o servidor).
+    """
+
+    def __init__(
+        self,
+        max_output_tokens: int = 4096,
+        temperature: float = 0.7,
+    ):
+        self.generation = {
+            "max_output_tokens": max_output_tokens,
+            "temperature": temperature,
+        }
+        self._pending: dict[str, str] = {}
+        self._first_pending_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        # Referências às tasks dos lotes em andamento (evita coleta pelo GC)
+        self._batches: set[asyncio.Task] = set()
+        # None = ainda na fila ou em processamento
+        self._results = TTLCache(
+            ttl_seconds=settings.GEMINI_BATCH_RESULT_TTL_SECONDS,
+            max_entries=100_000,
+        )
+
+    def submit(self, prompt: str) -> str:
+        """Coloca o prompt na fila e retorna o ID do resultado."""
+        job_id = uuid.uuid4().hex
+        if not self._pending:
+            self._first_pending_at = time.monotonic()
+        self._pending[job_id] = prompt
+        self._results.set(job_id, None)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        if len(self._pending) >= settings.GEMINI_BATCH_MAX_REQUESTS:
+            self._wakeup.set()
+        return job_id
+
+    def result(self, job_id: str) -> tuple[bool, Optional[dict]]:
+        """
+        Retorna (existe, resultado). O resultado, no formato de
+        `generate_content`, é None enquanto o lote não termina.
+        """
+        missing = object()
+        value = self._results.get(job_id, missing)
+        if value is missing:
+            return False, None
+        return True, value
+
+    async def _run(self):
+        """Worker: envia lotes enquanto houver prompts na fila."""
+        max_requests = settings.GEMINI_BATCH_MAX_REQUESTS
+        while self._pending:
+            # Espera o lote encher ou o prazo do prompt mais antigo vencer
+            deadline = self._first_pending_at + settings.GEMINI_BATCH_MAX_WAIT_SECONDS
+            remaining = deadline - time.monotonic()
+            if remaining > 0 and len(self._pending) < max_requests:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = dict(list(self._pending.items())[:max_requests])
+            for job_id in batch:
+                del self._pending[job_id]
+            self._first_pending_at = time.monotonic()
+
+            # Cada lote é acompanhado em uma task própria: o próximo pode ser
+            # montado enquanto o anterior ainda processa
+            task = asyncio.create_task(self._process_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _process_batch(self, batch: dict[str, str]):
+        """Envia um lote e guarda os resultados quando ele concluir."""
+        try:
+            await self._submit_and_wait(batch)
+        except Exception as e:
+            log.error("gemini_batch_unexpected_error", extra={"err": str(e)})
+            self._fail(batch, f"Erro inesperado: {str(e)}")
+
+    async def _submit_and_wait(self, batch: dict[str, str]):
+        """Cria o lote na Batch API e o consulta até concluir."""
+        created = await gemini_service.create_batch(batch, **self.generation)
+        if not created["success"]:
+            log.warning("gemini_batch_create_failed", extra={"err": created["error"]})
+            self._fail(batch, created["error"])
+            return
+
+        log.info(
+            "gemini_batch_created",
+            extra={"batch": created["name"], "requests": len(batch)},
+        )
+        while True:
+            await asyncio.sleep(settings.GEMINI_BATCH_POLL_SECONDS)
+            status = await gemini_service.get_batch(created["name"])
+            if status["done"]:
+                break
+
+        if status["error"]:
+            log.warning("gemini_batch_failed", extra={"err": status["error"]})
+            self._fail(batch, status["error"])
+            return
+
+        results = status["results"]
+        for job_id in batch:
+            self._results.set(
+                job_id,
+                results.get(job_id)
+                or {
+                    "success": False,
+                    "error": "Nenhuma resposta gerada pelo modelo",
+                    "content": None,
+                },
+            )
+        log.info("gemini_batch_done", extra={"batch": created["name"]})
+
+    def _fail(self, batch: dict[str, str], error: str):
+        """Marca todos os prompts do lote com o mesmo erro."""
+        for job_id in batch:
+            self._results.set(
+                job_id, {"success": False, "error": error, "content": None}
+            )
@@ -0,0 +1,45 @@
+"""
+Cliente HTTP compartilhado entre as requisições.
+Reaproveita conexões (keep-alive, TLS) com GitHub e Gemini em vez de
+abrir um cliente novo a cada chamada.
+"""
+import importlib.util
+import httpx
+from typing import Optional
+
+
+class HTTPClient:
+    """Classe para gerenciar o cliente HTTP da aplicação."""
+    client: Optional[httpx.AsyncClient] = None
+
+
+http = HTTPClient()
+
+# Limites do pool de conexões
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# HTTP/2 multiplexa as chamadas ao mesmo host (Gemini, api.github.com) em
+# uma única conexão. Depende do pacote `h2` (httpx[http2]); sem ele, HTTP/1.1.
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+
+async def start_http_client():
+    """Cria o cliente HTTP compartilhado."""
+    get_http_client()
+
+
+async def close_http_client():
+    """Fecha o cliente HTTP e suas conexões."""
+    if http.client is not None:
+        await http.client.aclose()
+        http.client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP compartilhado.
+    Fora do ciclo de vida da aplicação (scripts, testes) cria o cliente sob demanda.
+    """
+    if http.client is None or http.client.is_closed:
+        http.client = httpx.AsyncClient(limits=HTTP_LIMITS, http2=HTTP2_ENABLED)
+    return http.client
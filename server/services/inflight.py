@@ -0,0 +1,37 @@
+"""
+Agrupamento de requisições concorrentes idênticas (request coalescing).
+Enquanto uma operação está em andamento, chamadas com a mesma chave
+aguardam o mesmo resultado em vez de repetir o trabalho.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class InflightRequests:
+    """
+    Registro de operações em andamento, por chave.
+
+    A operação roda em uma task própria e cada chamador a aguarda via
+    `asyncio.shield`: se um cliente desconectar, os demais continuam
+    recebendo o resultado.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Executa `factory()` ou aguarda a execução já em andamento para `key`."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._discard(key, done))
+        return await asyncio.shield(task)
+
+    def _discard(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def __len__(self) -> int:
+        return len(self._tasks)
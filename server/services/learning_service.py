@@ -2,11 +2,21 @@
 Serviço para gerar recursos de aprendizado baseados em tecnologias detectadas.
 """
 
+import hashlib
 import json
+import logging
+import re
 from typing import List, Dict, Any
+from core.config import settings
+from core.error_sampler import should_log_trace
+from core.prompt_template import PromptTemplate
+from services.cache import TTLCache
 from services.gemini import gemini_service
+from services.inflight import InflightRequests
 
 
+log = logging.getLogger("nexo.learning")
+
 # Base de conhecimento de tecnologias comuns
 TECH_DATABASE = {
     "typescript": {
@@ -51,59 +61,49 @@ TECH_DATABASE = {
     "azure": {"icon": "☁️", "color": "#0078d4", "aliases": ["azure"]},
     "git": {"icon": "🔀", "color": "#f05032", "aliases": ["git"]},
 }
+# Alias -> nome canônico, montado uma vez a partir da base de conhecimento
+TECH_ALIASES: Dict[str, str] = {}
+for _canonical, _data in TECH_DATABASE.items():
+    for _alias in _data["aliases"]:
+        TECH_ALIASES.setdefault(_alias, _canonical)
+
+# Grafias diferentes da mesma tecnologia (só grafia: "node" e "javascript" ou
+# "next" e "nextjs" continuam distintas). Usado para remover repetidas e na
+# chave do cache; os aliases acima servem só para os metadados (ícone, cor)
+TECH_SPELLINGS: Dict[str, str] = {
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node",
+    "node.js": "node",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "next.js": "nextjs",
+    "expressjs": "express",
+    "express.js": "express",
+    "golang": "go",
+    "postgres": "postgresql",
+    "tailwind css": "tailwindcss",
+}
 
+# Recursos já gerados, por (tecnologias, hash do contexto). Respostas com
+# erro não entram no cache
+_learning_cache = TTLCache(
+    ttl_seconds=settings.LEARNING_CACHE_TTL_SECONDS,
+    max_entries=settings.LEARNING_CACHE_MAX_ENTRIES,
+)
 
-def normalize_tech_name(tech: str) -> str:
-    """Normaliza o nome de uma tecnologia."""
-    tech_lower = tech.lower().strip()
-
-    # Busca na base de conhecimento
-    for canonical, data in TECH_DATABASE.items():
-        if tech_lower in data["aliases"]:
-            return canonical
-
-    return tech_lower
-
-
-def get_tech_metadata(tech: str) -> Dict[str, str]:
-    """Retorna metadados de uma tecnologia (icon, color)."""
-    normalized = normalize_tech_name(tech)
-
-    if normalized in TECH_DATABASE:
-        return {
-            "icon": TECH_DATABASE[normalized]["icon"],
-            "color": TECH_DATABASE[normalized]["color"],
-        }
-
-    # Fallback para tecnologias desconhecidas
-    return {"icon": "📦", "color": "#6b7280"}
-
-
-async def generate_learning_resources(
-    technologies: List[str], repo_context: str = ""
-) -> Dict[str, Any]:
-    """
-    Gera recursos de aprendizado para as tecnologias detectadas.
-
-    Args:
-        technologies: Lista de tecnologias detectadas
-        repo_context: Contexto adicional sobre o repositório
-
-    Returns:
-        Dict com learning_resources e detected_technologies
-    """
-    if not technologies:
-        return {"learning_resources": [], "detected_technologies": []}
+# Gerações em andamento (requisições iguais aguardam a mesma chamada ao Gemini)
+_inflight_learning = InflightRequests()
 
-    # Limita a 10 tecnologias para não sobrecarregar
-    technologies = technologies[:10]
 
-    prompt = f"""You are a software development and technical education expert.
+# Prompt dos recursos de aprendizado (analisado uma única vez, na importação)
+LEARNING_PROMPT = PromptTemplate(
+    """You are a software development and technical education expert.
 
 Language: Your ENTIRE response MUST be in ENGLISH. If any source content is in Portuguese or another language, TRANSLATE everything to English.
 
-Technologies detected in the repository: {", ".join(technologies)}
-{f"Repository context: {repo_context}" if repo_context else ""}
+Technologies detected in the repository: {technologies}
+{context_line}
 
 For EACH technology listed above, generate:
 
@@ -160,7 +160,123 @@ Return ONLY valid JSON in the following format:
   ]
 }}
 
-Generate for ALL technologies: {", ".join(technologies)}"""
+Generate for ALL technologies: {technologies}"""
+)
+
+
+# Recursos aceitos na resposta da IA (os demais são descartados na leitura,
+# em vez de invalidarem a resposta inteira)
+RESOURCE_TYPES = frozenset({"docs", "article", "video"})
+HTTP_URL = re.compile(r"https?://", re.IGNORECASE)
+
+
+def _valid_resources(resources: Any) -> List[Dict[str, Any]]:
+    """Mantém só os recursos com tipo conhecido e URL http(s)."""
+    if not isinstance(resources, list):
+        return []
+    return [
+        resource
+        for resource in resources
+        if isinstance(resource, dict)
+        and resource.get("type") in RESOURCE_TYPES
+        and HTTP_URL.match(str(resource.get("url", "")))
+    ]
+
+
+def normalize_tech_name(tech: str) -> str:
+    """Normaliza o nome de uma tecnologia."""
+    tech_lower = tech.lower().strip()
+
+    # Busca na base de conhecimento
+    return TECH_ALIASES.get(tech_lower, tech_lower)
+
+
+def canonical_tech_spelling(tech: str) -> str:
+    """Grafia canônica de uma tecnologia ("React.js" e "REACT" -> "react")."""
+    tech_lower = tech.lower().strip()
+    return TECH_SPELLINGS.get(tech_lower, tech_lower)
+
+
+def dedupe_technologies(technologies: List[str]) -> List[str]:
+    """
+    Remove tecnologias repetidas (ex.: "React", "React.js" e "REACT"),
+    mantendo a primeira grafia de cada uma e a ordem original.
+    """
+    unique: Dict[str, str] = {}
+    for tech in technologies:
+        unique.setdefault(canonical_tech_spelling(tech), tech)
+    return list(unique.values())
+
+
+def get_tech_metadata(tech: str) -> Dict[str, str]:
+    """Retorna metadados de uma tecnologia (icon, color)."""
+    normalized = normalize_tech_name(tech)
+
+    if normalized in TECH_DATABASE:
+        return {
+            "icon": TECH_DATABASE[normalized]["icon"],
+            "color": TECH_DATABASE[normalized]["color"],
+        }
+
+    # Fallback para tecnologias desconhecidas
+    return {"icon": "📦", "color": "#6b7280"}
+
+
+def _learning_cache_key(technologies: List[str], repo_context: str) -> tuple:
+    """Chave canônica: grafias canônicas, sem ordem + hash do contexto."""
+    techs = tuple(sorted(canonical_tech_spelling(tech) for tech in technologies))
+    context_hash = hashlib.blake2b(repo_context.encode(), digest_size=8).hexdigest()
+    return techs, context_hash
+
+
+async def generate_learning_resources(
+    technologies: List[str], repo_context: str = ""
+) -> Dict[str, Any]:
+    """
+    Gera recursos de aprendizado para as tecnologias detectadas.
+
+    Args:
+        technologies: Lista de tecnologias detectadas
+        repo_context: Contexto adicional sobre o repositório
+
+    Returns:
+        Dict com learning_resources e detected_technologies
+    """
+    if not technologies:
+        return {"learning_resources": [], "detected_technologies": []}
+
+    # Limita a 10 tecnologias para não sobrecarregar
+    technologies = technologies[:10]
+
+    key = _learning_cache_key(technologies, repo_context)
+    result = _learning_cache.get(key)
+    if result is None:
+        result = await _inflight_learning.run(
+            key, lambda: _generate_and_cache(key, technologies, repo_context)
+        )
+
+    # Cópia rasa: o chamador pode alterar o dict (ex.: `pop("error")`)
+    return dict(result)
+
+
+async def _generate_and_cache(
+    key: tuple, technologies: List[str], repo_context: str
+) -> Dict[str, Any]:
+    """Gera os recursos e guarda no cache se não houve erro."""
+    result = await _generate_learning_resources(technologies, repo_context)
+    if "error" not in result:
+        _learning_cache.set(key, result)
+    return result
+
+
+async def _generate_learning_resources(
+    technologies: List[str], repo_context: str
+) -> Dict[str, Any]:
+    """Chama o Gemini e monta os recursos de aprendizado."""
+    prompt = LEARNING_PROMPT.render(
+        technologies=", ".join(technologies),
+        context_line=f"Repository context: {repo_context}" if repo_context else "",
+    )
 
     # Chama o Gemini
     result = await gemini_service.generate_content(
@@ -172,7 +288,7 @@ Generate for ALL technologies: {", ".join(technologies)}"""
 
     if not result["success"]:
         # Fallback em caso de erro
-        print(f"❌ Gemini falhou: {result['error']}")
+        log.warning("learning_gemini_failed", extra={"err": result["error"]})
         return {
             "learning_resources": [],
             "detected_technologies": technologies,
@@ -182,8 +298,6 @@ Generate for ALL technologies: {", ".join(technologies)}"""
     try:
         # Parse do JSON retornado pela IA
         content = result["content"].strip()
-        print(f"📄 Conteúdo bruto do Gemini (primeiros 500 chars): {content[:500]}")
-
         # Remove markdown code blocks se existirem
         if content.startswith("```json"):
             content = content[7:]
@@ -194,11 +308,7 @@ Generate for ALL technologies: {", ".join(technologies)}"""
 
         content = content.strip()
 
-        print(f"📄 Conteúdo limpo (primeiros 500 chars): {content[:500]}")
         data = json.loads(content)
-        print(
-            f"✅ JSON parseado com sucesso! {len(data.get('technologies', []))} tecnologias"
-        )
 
         # Adiciona metadados (icon, color) para cada tecnologia
         learning_resources = []
@@ -212,7 +322,7 @@ Generate for ALL technologies: {", ".join(technologies)}"""
                     "icon": metadata["icon"],
                     "color": metadata["color"],
                     "summary": tech_data.get("summary", ""),
-                    "resources": tech_data.get("resources", []),
+                    "resources": _valid_resources(tech_data.get("resources")),
                 }
             )
 
@@ -223,18 +333,22 @@ Generate for ALL technologies: {", ".join(technologies)}"""
 
     except json.JSONDecodeError as e:
         # Fallback: retorna vazio se não conseguir parsear
-        print(f"❌ Erro ao parsear JSON: {str(e)}")
-        print(f"❌ Conteúdo que falhou: {content[:1000]}")
+        log.warning("learning_json_invalid", extra={"err": str(e)})
+        # O trecho da resposta só é montado com o nível DEBUG ativo
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("learning_json_content", extra={"content": content[:1000]})
         return {
             "learning_resources": [],
             "detected_technologies": technologies,
             "error": f"Erro ao parsear resposta da IA: {str(e)}",
         }
     except Exception as e:
-        print(f"❌ Erro inesperado ao processar: {str(e)}")
-        import traceback
-
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        # Traceback amostrado: no máximo um por minuto por tipo de exceção
+        log.error(
+            "learning_processing_error",
+            extra={"err": str(e), "type": type(e).__name__},
+            exc_info=should_log_trace(f"learning_service:{type(e).__name__}"),
+        )
         return {
             "learning_resources": [],
             "detected_technologies": technologies,
@@ -0,0 +1,123 @@
+"""
+Job queue for podcasts generated in the background.
+
+With REDIS_URL set, jobs are appended to a Redis Stream (`podcast:jobs`) and
+consumed through a consumer group by a dedicated worker process
+(`python podcast_worker.py`): API workers only touch Redis and return
+immediately, generation survives API restarts and scales separately.
+The worker writes the audio to its own `podcasts/` directory, so it must be
+shared with the API (same host or a shared volume).
+
+Without Redis, jobs run as asyncio tasks inside the API process.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import orjson
+
+from core.config import settings
+from services.redis_client import get_redis
+
+log = logging.getLogger("nexo.podcast_queue")
+
+STREAM_KEY = "podcast:jobs"
+CONSUMER_GROUP = "podcast-workers"
+
+# handler(podcast_id, payload)
+JobHandler = Callable[[str, dict], Awaitable[None]]
+
+
+class PodcastJobQueue:
+    """Podcast jobs by type ("general", "specific"), each with its handler."""
+
+    def __init__(self):
+        self._handlers: dict[str, JobHandler] = {}
+        # References to the local jobs (keeps them from being garbage collected)
+        self._tasks: set[asyncio.Task] = set()
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Set the coroutine that runs jobs of this type."""
+        self._handlers[job_type] = handler
+
+    async def enqueue(self, job_type: str, podcast_id: str, payload: dict):
+        """Queue a job (Redis Stream, or a local task without Redis)."""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown podcast job type: {job_type}")
+
+        client = get_redis()
+        if client is None:
+            task = asyncio.create_task(self._run_job(job_type, podcast_id, payload))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+
+        await client.xadd(
+            STREAM_KEY,
+            {"type": job_type, "id": podcast_id, "payload": orjson.dumps(payload)},
+            maxlen=settings.PODCAST_QUEUE_MAX_LEN,
+            approximate=True,
+        )
+
+    async def _run_job(self, job_type: str, podcast_id: str, payload: dict):
+        try:
+            await self._handlers[job_type](podcast_id, payload)
+        except Exception:
+            log.exception("Podcast job %s (%s) failed", podcast_id, job_type)
+
+    async def consume(self, consumer: str):
+        """
+        Worker loop: run the stream's jobs, PODCAST_WORKER_CONCURRENCY at a time.
+        Jobs left unacknowledged by a previous run of the same consumer (crash,
+        deploy) are run again first.
+        """
+        client = get_redis()
+        if client is None:
+            raise RuntimeError("REDIS_URL is required to run the podcast worker")
+
+        from redis.exceptions import ResponseError
+
+        try:
+            await client.xgroup_create(
+                STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        await asyncio.gather(
+            *(
+                self._consume_loop(f"{consumer}-{slot}")
+                for slot in range(settings.PODCAST_WORKER_CONCURRENCY)
+            )
+        )
+
+    async def _consume_loop(self, consumer: str):
+        client = get_redis()
+        # "0" = this consumer's pending jobs, ">" = new jobs
+        stream_id = "0"
+        while True:
+            response = await client.xreadgroup(
+                CONSUMER_GROUP,
+                consumer,
+                {STREAM_KEY: stream_id},
+                count=1,
+                block=settings.PODCAST_WORKER_BLOCK_MS,
+            )
+            entries = response[0][1] if response else []
+            if not entries:
+                stream_id = ">"
+                continue
+
+            for entry_id, fields in entries:
+                # Pending entries already trimmed from the stream have no fields
+                if fields:
+                    await self._run_job(
+                        fields["type"], fields["id"], orjson.loads(fields["payload"])
+                    )
+                await client.xack(STREAM_KEY, CONSUMER_GROUP, entry_id)
+
+
+# Global queue instance
+podcast_queue = PodcastJobQueue()
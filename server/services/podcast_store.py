@@ -0,0 +1,68 @@
+"""
+Status store for podcasts generated in the background.
+
+With REDIS_URL set, each podcast is a Redis hash (`podcast:{id}`) with a TTL,
+so the status survives restarts and is shared across Uvicorn workers.
+Without it, a bounded in-memory TTL cache is used (single process only).
+"""
+
+from typing import Optional
+
+from core.config import settings
+from services.cache import TTLCache
+from services.redis_client import get_redis
+
+# Fields stored as integers (Redis hashes only hold strings)
+INT_FIELDS = ("progress",)
+
+
+class PodcastStatusStore:
+    """Podcast job status by podcast_id, expiring after PODCAST_STATUS_TTL_SECONDS."""
+
+    def __init__(self):
+        self.ttl_seconds = settings.PODCAST_STATUS_TTL_SECONDS
+        self._local = TTLCache(
+            ttl_seconds=self.ttl_seconds,
+            max_entries=settings.PODCAST_STATUS_MAX_ENTRIES,
+        )
+
+    @staticmethod
+    def _key(podcast_id: str) -> str:
+        return f"podcast:{podcast_id}"
+
+    async def update(self, podcast_id: str, **fields):
+        """Create or update a podcast's status fields (None values are skipped)."""
+        fields = {name: value for name, value in fields.items() if value is not None}
+
+        client = get_redis()
+        if client is None:
+            status = self._local.get(podcast_id) or {}
+            status.update(fields)
+            self._local.set(podcast_id, status)
+            return
+
+        # HSET + EXPIRE in a single round trip
+        key = self._key(podcast_id)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={name: str(value) for name, value in fields.items()})
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def get(self, podcast_id: str) -> Optional[dict]:
+        """Return the podcast's status fields, or None if unknown/expired."""
+        client = get_redis()
+        if client is None:
+            status = self._local.get(podcast_id)
+            return dict(status) if status is not None else None
+
+        status = await client.hgetall(self._key(podcast_id))
+        if not status:
+            return None
+        for name in INT_FIELDS:
+            if name in status:
+                status[name] = int(status[name])
+        return status
+
+
+# Global store instance
+podcast_store = PodcastStatusStore()
@@ -0,0 +1,72 @@
+"""
+Pool de processos para o trabalho de CPU das requisições (ex.: descompactar
+e analisar o ZIP de um repositório).
+
+Em uma thread, esse trabalho ainda disputa o GIL com o event loop; em outro
+processo, as demais requisições seguem sendo atendidas normalmente.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from core.config import settings
+
+log = logging.getLogger("nexo.process_pool")
+
+
+class ProcessPool:
+    """Classe para gerenciar o pool de processos da aplicação."""
+
+    executor: Optional[ProcessPoolExecutor] = None
+
+
+pool = ProcessPool()
+
+
+def _create_executor() -> ProcessPoolExecutor:
+    # "spawn": o processo principal tem threads (event loop, logging), e um
+    # fork herdaria locks no meio do uso
+    return ProcessPoolExecutor(
+        max_workers=settings.CPU_PROCESS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+async def start_process_pool():
+    """Cria o pool de processos (0 workers desativa: usa threads)."""
+    if settings.CPU_PROCESS_WORKERS > 0:
+        pool.executor = _create_executor()
+
+
+async def close_process_pool():
+    """Encerra o pool, cancelando o que ainda não começou."""
+    if pool.executor is not None:
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+        pool.executor = None
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args) -> Any:
+    """
+    Executa `func(*args)` no pool de processos. `func`, os argumentos e o
+    retorno precisam ser serializáveis (pickle).
+
+    Fora do ciclo de vida da aplicação (scripts, testes) ou com o pool
+    desativado, roda em uma thread. Se um worker morrer, o pool é recriado
+    e a chamada roda em uma thread.
+    """
+    executor = pool.executor
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        log.error("process_pool_broken")
+        if pool.executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            pool.executor = _create_executor()
+        return await asyncio.to_thread(func, *args)
@@ -0,0 +1,39 @@
+"""
+Limite de taxa de chamadas (token bucket).
+Espalha as chamadas a uma API dentro da cota por minuto em vez de deixar
+uma rajada estourar a cota e virar uma sequência de erros 429.
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Até `rate` chamadas por `period` segundos, com rajadas de até `rate`.
+
+    Quem chega com o balde vazio espera o próximo token; a fila é atendida
+    em ordem de chegada.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(rate)
+        self.fill_rate = rate / period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Aguarda até que uma chamada possa ser feita."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.fill_rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.fill_rate)
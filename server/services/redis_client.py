@@ -0,0 +1,41 @@
+"""
+Cliente Redis compartilhado (opcional: só existe com REDIS_URL configurada).
+Quem o usa tem um fallback em memória para quando ele não está disponível.
+"""
+from typing import TYPE_CHECKING, Optional
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+class RedisClient:
+    """Classe para gerenciar a conexão com o Redis."""
+    client: Optional["Redis"] = None
+
+
+redis_conn = RedisClient()
+
+
+async def connect_to_redis():
+    """Conecta ao Redis, se configurado."""
+    if not settings.REDIS_URL:
+        return
+
+    from redis import asyncio as aioredis
+
+    redis_conn.client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    await redis_conn.client.ping()
+
+
+async def close_redis_connection():
+    """Fecha o pool de conexões com o Redis."""
+    if redis_conn.client is not None:
+        await redis_conn.client.aclose()
+        redis_conn.client = None
+
+
+def get_redis() -> Optional["Redis"]:
+    """Retorna o cliente Redis, ou None se não configurado."""
+    return redis_conn.client
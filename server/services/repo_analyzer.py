@@ -3,9 +3,11 @@ Quick repository analyzer for podcast generation
 This is a simplified analyzer until the full AI agent is ready
 """
 
-import httpx
+import asyncio
 from typing import Dict, Any, Optional
-import re
+
+from core.github_url import GITHUB_REPO_URL
+from services.http_client import get_http_client
 
 
 async def analyze_github_repo(repo_url: str) -> Dict[str, Any]:
@@ -19,43 +21,44 @@ async def analyze_github_repo(repo_url: str) -> Dict[str, Any]:
         Dictionary with repository analysis
     """
     # Extract owner and repo name from URL
-    match = re.match(r'https?://github\.com/([^/]+)/([^/]+)', repo_url)
+    match = GITHUB_REPO_URL.fullmatch(repo_url.strip())
     if not match:
         raise ValueError("Invalid GitHub repository URL")
     
     owner, repo = match.groups()
-    repo = repo.replace('.git', '')
-    
-    # Fetch repository data from GitHub API
-    async with httpx.AsyncClient() as client:
-        # Get basic repo info
-        repo_response = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}",
-            headers={"Accept": "application/vnd.github.v3+json"}
-        )
-        
-        if repo_response.status_code == 404:
-            raise ValueError("Repository not found")
-        
-        repo_response.raise_for_status()
-        repo_data = repo_response.json()
-        
-        # Get languages
-        languages_response = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/languages",
-            headers={"Accept": "application/vnd.github.v3+json"}
-        )
-        languages = list(languages_response.json().keys()) if languages_response.status_code == 200 else []
-        
-        # Get README (simplified)
-        try:
-            readme_response = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/readme",
-                headers={"Accept": "application/vnd.github.v3+json"}
-            )
-            has_readme = readme_response.status_code == 200
-        except:
-            has_readme = False
+    
+    # Fetch repository data from GitHub API (shared client: pooled connections)
+    client = get_http_client()
+    repo_api_url = f"https://api.github.com/repos/{owner}/{repo}"
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    # Repo info, languages and README are independent: fetched concurrently
+    repo_response, languages_response, readme_response = await asyncio.gather(
+        client.get(repo_api_url, headers=headers),
+        client.get(f"{repo_api_url}/languages", headers=headers),
+        client.get(f"{repo_api_url}/readme", headers=headers),
+        return_exceptions=True
+    )
+    
+    # Get basic repo info
+    if isinstance(repo_response, BaseException):
+        raise repo_response
+    
+    if repo_response.status_code == 404:
+        raise ValueError("Repository not found")
+    
+    repo_response.raise_for_status()
+    repo_data = repo_response.json()
+    
+    # Get languages
+    if isinstance(languages_response, BaseException):
+        raise languages_response
+    languages = list(languages_response.json().keys()) if languages_response.status_code == 200 else []
+    
+    # Get README (simplified)
+    has_readme = (
+        not isinstance(readme_response, BaseException)
+        and readme_response.status_code == 200
+    )
     
     # Build analysis
     analysis = {